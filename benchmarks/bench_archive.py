@@ -0,0 +1,91 @@
+"""
+Archivage des emprunts rendus : requêtes sur les emprunts en cours (tableau de bord
+client, disponibilité d'un média, retards du tableau de bord staff) et historique d'un
+membre, avant puis après le déplacement des emprunts rendus depuis plus d'un an vers
+ArchivedBorrow (durée de l'archivage mesurée).
+
+    python benchmarks/bench_archive.py [--loans 200000] [--members 2000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from common import QueryCounter, setup_django
+
+
+def measure(repeat, func):
+    # Meilleur temps sur `repeat` passages, et requêtes SQL d'un passage
+    timings = []
+    for _ in range(repeat):
+        with QueryCounter() as counter:
+            func()
+        timings.append(counter.elapsed)
+    return min(timings), counter.count
+
+
+def workloads(member_ids, media_ids):
+    from django.utils import timezone
+    from mediatheque.archive import member_history
+    from mediatheque.models import MediathequeBorrow
+
+    def active_borrows():
+        for user_id in member_ids:
+            list(MediathequeBorrow.objects.filter(user_id=user_id, is_returned=False).select_related('media'))
+
+    def media_borrowed():
+        for media_id in media_ids:
+            MediathequeBorrow.objects.filter(media_id=media_id, is_returned=False).exists()
+
+    def overdue():
+        list(MediathequeBorrow.objects.filter(is_returned=False, due_date__lt=timezone.now()).select_related(
+            'media', 'user'))
+
+    def history():
+        for user_id in member_ids:
+            list(member_history(user_id))
+
+    return {f'en cours, {len(member_ids)} membres': active_borrows,
+            f'média emprunté ?, {len(media_ids)} médias': media_borrowed,
+            'retards (staff)': overdue,
+            f'historique, {len(member_ids)} membres': history}
+
+
+def report(label, results):
+    print(label)
+    for name, (elapsed, queries) in results.items():
+        print(f"  {name:28}: {elapsed * 1000:9.2f} ms   {queries:5} requêtes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--loans', type=int, default=200000)
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--media', type=int, default=10000)
+    parser.add_argument('--sample', type=int, default=200, help="Membres et médias interrogés")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.utils import timezone
+    from datagen import generate
+    from mediatheque.archive import archive_returned_borrows
+    from mediatheque.models import ArchivedBorrow, MediathequeBorrow
+
+    generate(members=args.members, media=args.media, loans=args.loans, staff=0)
+    member_ids = list(MediathequeBorrow.objects.values_list('user_id', flat=True).distinct()[:args.sample])
+    media_ids = list(MediathequeBorrow.objects.values_list('media_id', flat=True).distinct()[:args.sample])
+
+    report(f"Avant : {MediathequeBorrow.objects.count()} emprunts dans la table",
+           {name: measure(args.repeat, func) for name, func in workloads(member_ids, media_ids).items()})
+
+    started = time.perf_counter()
+    archived = archive_returned_borrows(before=timezone.now() - timedelta(days=365))
+    print(f"Archivage : {archived} emprunts en {time.perf_counter() - started:.2f} s")
+
+    report(f"Après : {MediathequeBorrow.objects.count()} emprunts dans la table, "
+           f"{ArchivedBorrow.objects.count()} archivés",
+           {name: measure(args.repeat, func) for name, func in workloads(member_ids, media_ids).items()})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Débit des vues de consultation (media_list, tableaux de bord, détail d'un emprunt)
+servies en WSGI (wsgiref multi-thread) puis en ASGI (uvicorn), avec N clients HTTP
+concurrents en connexion persistante.
+
+Les deux serveurs tournent dans ce processus, sur la même base ; uvicorn est
+optionnel (pip install uvicorn) : sans lui, seul le chemin WSGI est mesuré.
+
+    python benchmarks/bench_asgi.py [--clients 16] [--seconds 10] [--view staff_dashboard]
+"""
+import argparse
+import http.client
+import threading
+import time
+
+from common import free_port, percentile, serve_wsgi, setup_django
+
+VIEWS = {
+    'media_list': lambda: ('media_list', []),
+    'staff_dashboard': lambda: ('authentification:espace_staff', []),
+    'borrow_detail': lambda: ('borrow_detail', [1]),
+}
+
+
+def load(port, path, cookie, clients, seconds):
+    # Chaque client garde sa connexion HTTP/1.1 ouverte et enchaîne les requêtes
+    deadline = time.perf_counter() + seconds
+    timings, errors = [], []
+    lock = threading.Lock()
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            connection.request('GET', path, headers={'Cookie': cookie, 'Host': 'localhost'})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                with lock:
+                    errors.append(response.status)
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            timings.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings, errors
+
+
+def report(label, timings, errors, seconds):
+    print(f"  {label:5}: {len(timings) / seconds:7.0f} req/s   p50 {percentile(timings, 50) * 1000:7.1f} ms   "
+          f"p99 {percentile(timings, 99) * 1000:7.1f} ms   erreurs {len(errors)}")
+
+
+def run_wsgi(path, cookie, args):
+    from django.core.wsgi import get_wsgi_application
+
+    with serve_wsgi(get_wsgi_application()) as port:
+        return load(port, path, cookie, args.clients, args.seconds)
+
+
+def run_asgi(path, cookie, args):
+    import uvicorn
+    from django.core.asgi import get_asgi_application
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(get_asgi_application(), host='127.0.0.1', port=port,
+                                           log_level='warning', lifespan='off'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        return load(port, path, cookie, args.clients, args.seconds)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--view', choices=sorted(VIEWS), default='staff_dashboard')
+    parser.add_argument('--media', type=int, default=2000)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Group
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+    from mediatheque.content_types import content_type_id_for
+    from mediatheque.models import Media, MediathequeBorrow
+
+    settings.ALLOWED_HOSTS = ['localhost']
+    settings.DEBUG = False
+    content_type_id = content_type_id_for(Media)
+    Media.objects.bulk_create([
+        Media(name=f'Média {i:05}', media_type='book', content_type_id=content_type_id)
+        for i in range(args.media)
+    ], batch_size=500)
+    user = get_user_model().objects.create_superuser(username='bench', password='bench')
+    user.groups.add(Group.objects.get_or_create(name='staff')[0])
+    now = timezone.now()
+    MediathequeBorrow.objects.create(user=user, media_id=1, borrow_date=now, due_date=now)
+
+    client = Client()
+    client.force_login(user)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+    name, url_args = VIEWS[args.view]()
+    path = reverse(name, args=url_args)
+
+    print(f"{args.view} ({path}), {args.clients} clients, {args.seconds} s")
+    report('WSGI', *run_wsgi(path, cookie, args), args.seconds)
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        print("  ASGI : uvicorn n'est pas installé (pip install uvicorn)")
+        return
+    report('ASGI', *run_asgi(path, cookie, args), args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Rendu de la liste des médias de staff_dashboard.html sur une page de 10 000 lignes :
+lignes seules avec l'ancien get_media_type_display (dict(MEDIA_TYPES) reconstruit à
+chaque appel) puis avec le mapping de classe, et tableau de bord complet à froid
+(fragment de page écrit) et à chaud (fragment lu depuis le cache).
+Mesure aussi le chargement du gabarit avec et sans le chargeur mis en cache.
+
+    python benchmarks/bench_dashboard_render.py [--rows 10000] [--repeat 3]
+"""
+import argparse
+import time
+
+from common import setup_django
+
+LEGACY_ROWS = """{% for media in all_media %}
+    <li>
+        <strong>{{ media.name }}</strong><br>
+        {{ media.get_media_type_display }}<br>
+        {% if media.can_borrow %}
+        <a href="{% url 'borrow_media' media.id %}">Emprunter</a>
+        {% else %}
+        <span style="color: gray;">Non empruntable</span>
+        {% endif %}
+    </li>
+{% endfor %}"""
+
+
+def legacy_get_media_type_display(self):
+    return dict(self.MEDIA_TYPES).get(self.media_type, self.media_type)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.template import engines
+    from django.template.engine import Engine
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+    from mediatheque.caching import fragment_context
+    from mediatheque.content_types import content_type_id_for
+    from mediatheque.models import Media
+    from mediatheque.pagination import KeysetPage
+
+    media_types = [value for value, _ in Media.MEDIA_TYPES]
+    content_type_id = content_type_id_for(Media)
+    Media.objects.bulk_create([
+        Media(name=f'Média {i:05}', media_type=media_types[i % len(media_types)],
+              can_borrow=i % 5 != 0, content_type_id=content_type_id)
+        for i in range(args.rows)
+    ], batch_size=500)
+    medias = list(Media.objects.order_by('name', 'id'))
+
+    request = RequestFactory().get('/espace_staff/')
+    request.user = AnonymousUser()
+    context = {'borrows': KeysetPage([]), 'overdue_borrows': [], 'all_media': KeysetPage(medias)}
+    django_engine = engines['django']
+
+    # Lignes seules : ancien libellé (dict reconstruit à chaque appel) puis mapping de classe
+    rows_template = django_engine.from_string(LEGACY_ROWS)
+    current_display = Media.get_media_type_display
+    Media.get_media_type_display = legacy_get_media_type_display
+    try:
+        before = best_of(args.repeat, lambda: rows_template.render(context, request))
+    finally:
+        Media.get_media_type_display = current_display
+    mapping = best_of(args.repeat, lambda: rows_template.render(context, request))
+
+    # Gabarit complet avec le fragment de page : à froid (fragment écrit) puis à chaud (lu depuis le cache)
+    def render_dashboard():
+        return render_to_string('authentification/staff_dashboard.html', {**context, **fragment_context()}, request)
+
+    cold = []
+    for _ in range(args.repeat):
+        cache.clear()
+        started = time.perf_counter()
+        render_dashboard()
+        cold.append(time.perf_counter() - started)
+    warm = best_of(args.repeat, render_dashboard)
+
+    print(f"Rendu de {args.rows} lignes (meilleur de {args.repeat})")
+    print(f"  lignes, ancien libellé     : {before * 1000:8.1f} ms")
+    print(f"  lignes, mapping de classe  : {mapping * 1000:8.1f} ms")
+    print(f"  tableau de bord, à froid   : {min(cold) * 1000:8.1f} ms")
+    print(f"  tableau de bord, à chaud   : {warm * 1000:8.1f} ms")
+
+    # Chargement + compilation du gabarit : chargeurs simples contre chargeur mis en cache
+    settings_engine = django_engine.engine
+    plain = Engine(dirs=settings_engine.dirs, libraries=settings_engine.libraries, loaders=[
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ])
+    loads = 1000
+    name = 'authentification/staff_dashboard.html'
+    uncached = best_of(1, lambda: [plain.get_template(name) for _ in range(loads)])
+    cached = best_of(1, lambda: [settings_engine.get_template(name) for _ in range(loads)])
+    print(f"Chargement du gabarit ({loads} fois)")
+    print(f"  sans cache                 : {uncached * 1000:8.1f} ms")
+    print(f"  chargeur en cache          : {cached * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Surcoût de RequestStatsMiddleware : débit de media_list via le client de test,
+middleware désactivé puis activé.
+
+    python benchmarks/bench_instrumentation.py [--requests 2000] [--media 50]
+"""
+import argparse
+import time
+
+from common import setup_django
+
+
+def run(settings, user, enabled, requests):
+    from django.test import Client
+    from django.urls import reverse
+
+    settings.REQUEST_STATS = {**settings.REQUEST_STATS, 'ENABLED': enabled}
+    client = Client()
+    client.force_login(user)
+    url = reverse('media_list')
+    client.get(url)  # chauffe
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--media', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from mediatheque.models import Book
+
+    settings.ALLOWED_HOSTS = ['testserver']
+    for i in range(args.media):
+        Book.objects.create(name=f'Livre {i}', author='Auteur')
+    user = get_user_model().objects.create_superuser(username='bench', password='bench')
+
+    # Tours alternés pour lisser les variations de la machine ; on garde le meilleur temps
+    timings = {False: [], True: []}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            timings[enabled].append(run(settings, user, enabled, args.requests))
+
+    disabled, enabled = min(timings[False]), min(timings[True])
+    print(f"media_list, {args.requests} requêtes, {args.media} médias")
+    print(f"  désactivé : {args.requests / disabled:.0f} req/s")
+    print(f"  activé    : {args.requests / enabled:.0f} req/s")
+    print(f"  surcoût   : {(enabled - disabled) / disabled:+.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Débit de login_view selon le profil de hachage des mots de passe (PASSWORD_PROFILES
+dans settings.py, plus 'md5') : coût d'un hachage, puis N clients HTTP concurrents qui
+enchaînent page de connexion et envoi du formulaire face au serveur WSGI du processus.
+
+Pour chaque profil, les mots de passe des membres sont refaits avec son premier hacheur :
+chaque connexion vérifie donc un hachage à ce coût. 'md5' (MD5_HASHERS des tests et
+benchmarks) donne le plafond sans hachage.
+
+    python benchmarks/bench_login.py [--profiles default,scrypt,argon2,md5] [--workers 8] [--iterations 20]
+"""
+import argparse
+import importlib.util
+import time
+
+from common import MD5_HASHERS, setup_django
+
+PROFILES = ['default', 'scrypt', 'argon2', 'md5']
+
+
+def hash_cost(repeat):
+    # Meilleur temps d'un hachage avec le hacheur préféré
+    from django.contrib.auth.hashers import get_hasher
+
+    hasher = get_hasher()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hasher.encode('bench-password', hasher.salt())
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def rehash_members(password):
+    # Un seul hachage partagé : seule la vérification à la connexion est mesurée
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    get_user_model().objects.filter(role='client').update(password=make_password(password))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    parser.add_argument('--workers', type=int, default=8, help="Clients HTTP concurrents")
+    parser.add_argument('--iterations', type=int, default=20, help="Connexions par client")
+    parser.add_argument('--members', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from datagen import PASSWORD, generate
+    from drivers import WSGIDriver
+    from run import run_scenario
+    from scenarios import Worker, login
+
+    settings.ALLOWED_HOSTS = ['localhost', 'testserver']
+    settings.DEBUG = False
+    generate(members=args.members, media=0, loans=0, staff=0)
+
+    for profile in args.profiles.split(','):
+        if profile == 'argon2' and importlib.util.find_spec('argon2') is None:
+            print(f"{profile:8}: ignoré (argon2-cffi non installé)")
+            continue
+        # override_settings vide le cache des hacheurs de Django
+        hashers = MD5_HASHERS if profile == 'md5' else settings.PASSWORD_PROFILES[profile]
+        with override_settings(PASSWORD_HASHERS=hashers):
+            cost = hash_cost(repeat=3)
+            rehash_members(PASSWORD)
+            driver = WSGIDriver()
+            with driver.running():
+                workers = [Worker(driver, None, [], args.members, seed=i) for i in range(args.workers)]
+                stats = run_scenario(workers, login, args.iterations)['login']
+                for worker in workers:
+                    worker.close()
+        print(f"{profile:8}: hachage {cost * 1000:7.1f} ms   {stats['rps']:7.1f} connexions/s   "
+              f"p50 {stats['p50_ms']:7.1f} ms   p95 {stats['p95_ms']:7.1f} ms   erreurs {stats['errors']}")
+
+
+if __name__ == '__main__':
+    main()
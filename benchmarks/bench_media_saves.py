@@ -0,0 +1,53 @@
+"""
+Requêtes SQL par save() des sous-classes de Media, avec l'ancienne résolution du
+ContentType (get_for_model + lecture de self.content_type) et avec le cache actuel.
+
+    python benchmarks/bench_media_saves.py [--saves 10000]
+"""
+import argparse
+
+from common import QueryCounter, setup_django
+
+
+def legacy_save(media):
+    # Reproduit l'ancien Book.save() : « if not self.content_type » charge le ContentType
+    # depuis la base pour chaque instance lue, puis get_for_model est appelé
+    from django.contrib.contenttypes.models import ContentType
+    if not media.content_type:
+        media.content_type = ContentType.objects.get_for_model(type(media))
+    ContentType.objects.get_for_model(type(media))
+    media.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--saves', type=int, default=10000)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.db import transaction
+    from mediatheque.models import Book
+    from staff.models import BookStaff
+
+    for model, creator in ((Book, 'author'), (BookStaff, 'author')):
+        with transaction.atomic():
+            for i in range(args.saves):
+                model.objects.create(name=f'Livre {i}', **{creator: 'Auteur'})
+
+        results = {}
+        for label, save in (('avant', legacy_save), ('après', lambda media: media.save())):
+            with transaction.atomic(), QueryCounter() as counter:
+                for media in model.objects.all().iterator(chunk_size=2000):
+                    media.name += '.'
+                    save(media)
+            results[label] = counter
+
+        saved = results['avant'].count - results['après'].count
+        print(f"{model.__name__} : {args.saves} save()")
+        for label, counter in results.items():
+            print(f"  {label:5} : {counter.count} requêtes, {counter.elapsed:.2f} s")
+        print(f"  requêtes évitées : {saved} ({saved / args.saves:.2f} par save)")
+
+
+if __name__ == '__main__':
+    main()
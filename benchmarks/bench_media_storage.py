@@ -0,0 +1,170 @@
+"""
+Stockage des médias : ancien héritage multi-table (une table par sous-classe, jointure
+à chaque lecture) contre la table unique avec media_type pour discriminant.
+
+Sur une même base : insertion et lectures avec le schéma multi-table (migration 0004),
+puis migration vers la table unique (durée mesurée, avec les lignes déjà présentes),
+puis mêmes lectures et insertions avec le schéma actuel. Les modèles utilisés sont ceux
+de l'état des migrations : aucun signal (index de recherche, cache) ne fausse la mesure.
+
+    python benchmarks/bench_media_storage.py [--media 20000] [--page 50] [--repeat 20]
+"""
+import argparse
+import time
+
+from common import QueryCounter, setup_django
+
+MTI = [('mediatheque', '0004_overdue_maintenance')]
+TYPES = [('book', 'Book', 'author'), ('dvd', 'DVD', 'producer'), ('cd', 'CD', 'artist'),
+         ('board_game', 'BoardGame', 'creators')]
+# Colonnes NOT NULL des tables filles, sans valeur par défaut en base
+CHILD_DEFAULTS = {'BoardGame': {'is_visible': True, 'is_available': True}}
+
+
+def measure(repeat, func):
+    # Meilleur temps sur `repeat` passages, et requêtes SQL d'un passage
+    timings = []
+    for _ in range(repeat):
+        with QueryCounter() as counter:
+            func()
+        timings.append(counter.elapsed)
+    return min(timings), counter.count
+
+
+def content_types(apps):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    return {name: ContentType.objects.get_or_create(app_label='mediatheque', model=name.lower())[0].pk
+            for _, name, _ in TYPES}
+
+
+def insert_mti(apps, count, offset):
+    # Chemin de l'ancien import : INSERT groupé des parents puis executemany par table fille
+    from django.db import connection, transaction
+
+    Media = apps.get_model('mediatheque', 'Media')
+    type_ids = content_types(apps)
+    with transaction.atomic():
+        for media_type, name, field in TYPES:
+            parents = Media.objects.bulk_create([
+                Media(name=f'Média {i:06} {name}', media_type=media_type, content_type_id=type_ids[name])
+                for i in range(offset, offset + count // len(TYPES))
+            ], batch_size=500)
+            defaults = CHILD_DEFAULTS.get(name, {})
+            columns = ', '.join(['media_ptr_id', field, *defaults])
+            placeholders = ', '.join(['%s'] * (2 + len(defaults)))
+            with connection.cursor() as cursor:
+                cursor.executemany(f'INSERT INTO mediatheque_{name.lower()} ({columns}) VALUES ({placeholders})',
+                                   [(media.pk, f'Créateur {media.pk}', *defaults.values()) for media in parents])
+
+
+def insert_single_table(apps, count, offset):
+    # Chemin actuel de l'import : un executemany sur la table des médias
+    from django.db import transaction
+    from mediatheque.importer import _insert_media
+
+    type_ids = content_types(apps)
+    with transaction.atomic():
+        _insert_media([
+            {'name': f'Média {i:06} {name}', 'media_type': media_type, 'content_type_id': type_ids[name],
+             field: f'Créateur {i}'}
+            for media_type, name, field in TYPES for i in range(offset, offset + count // len(TYPES))
+        ])
+
+
+def create_rows(apps, count, offset):
+    # Un create() par média : deux INSERT en multi-table, un seul en table unique
+    from django.db import transaction
+
+    type_ids = content_types(apps)
+    with transaction.atomic():
+        for i in range(offset, offset + count):
+            media_type, name, field = TYPES[i % len(TYPES)]
+            apps.get_model('mediatheque', name).objects.create(
+                name=f'Média {i:06} {name}', media_type=media_type, content_type_id=type_ids[name],
+                **{field: f'Créateur {i}'})
+
+
+def listings(apps, page, single_table):
+    Media = apps.get_model('mediatheque', 'Media')
+    models = {media_type: apps.get_model('mediatheque', name) for media_type, name, _ in TYPES}
+
+    def book_page():
+        # Book.objects... : jointure media/book en multi-table
+        queryset = models['book'].objects.order_by('name', 'id')
+        if single_table:
+            queryset = queryset.filter(media_type='book')
+        return list(queryset[:page])
+
+    def catalogue_page_by_type():
+        # Page du catalogue avec les attributs de chaque type
+        medias = list(Media.objects.order_by('name', 'id')[:page])
+        if single_table:
+            return [(media.name, media.author or media.producer or media.artist or media.creators)
+                    for media in medias]
+        ids_by_type = {}
+        for media in medias:
+            ids_by_type.setdefault(media.media_type, []).append(media.pk)
+        # Au mieux une requête IN par type
+        children = {}
+        for media_type, ids in ids_by_type.items():
+            children.update(models[media_type].objects.in_bulk(ids))
+        return [(media.name, children.get(media.pk)) for media in medias]
+
+    def catalogue_page_per_row():
+        # Accès naïf à la sous-classe, une requête par ligne en multi-table
+        medias = list(Media.objects.order_by('name', 'id')[:page])
+        if single_table:
+            return medias
+        return [models[media.media_type].objects.filter(pk=media.pk).first() for media in medias]
+
+    return {'page de livres': book_page, 'catalogue, par type': catalogue_page_by_type,
+            'catalogue, par ligne': catalogue_page_per_row}
+
+
+def report(label, results):
+    print(label)
+    for name, (elapsed, queries) in results.items():
+        print(f"  {name:22}: {elapsed * 1000:9.2f} ms   {queries:4} requêtes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--media', type=int, default=20000)
+    parser.add_argument('--creates', type=int, default=2000)
+    parser.add_argument('--page', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.db import connection
+    from django.db.migrations.executor import MigrationExecutor
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(MTI)
+    apps = executor.loader.project_state(MTI).apps
+
+    results = {}
+    results['insertion groupée'] = measure(1, lambda: insert_mti(apps, args.media, 0))
+    results['create() par média'] = measure(1, lambda: create_rows(apps, args.creates, args.media))
+    for name, func in listings(apps, args.page, single_table=False).items():
+        results[name] = measure(args.repeat, func)
+    report(f"Multi-table, {args.media} médias", results)
+
+    executor = MigrationExecutor(connection)
+    targets = executor.loader.graph.leaf_nodes()
+    started = time.perf_counter()
+    executor.migrate(targets)
+    print(f"Migration vers la table unique : {time.perf_counter() - started:.2f} s")
+    apps = executor.loader.project_state(targets).apps
+
+    results = {}
+    for name, func in listings(apps, args.page, single_table=True).items():
+        results[name] = measure(args.repeat, func)
+    offset = args.media + args.creates
+    results['insertion groupée'] = measure(1, lambda: insert_single_table(apps, args.media, offset))
+    results['create() par média'] = measure(1, lambda: create_rows(apps, args.creates, offset + args.media))
+    report("Table unique", results)
+
+
+if __name__ == '__main__':
+    main()
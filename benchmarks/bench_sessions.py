@@ -0,0 +1,100 @@
+"""
+Écritures SQLite par requête selon le moteur de session (SESSION_PROFILES dans settings.py)
+et le stockage des messages : connexion, tableau de bord, emprunt, retour, déconnexion,
+joués par un compte staff avec le client de test de Django.
+
+La configuration 'avant' reprend les réglages par défaut de Django : sessions en base et
+messages en cookie avec repli sur la session.
+
+    python benchmarks/bench_sessions.py [--iterations 50]
+"""
+import argparse
+import time
+from collections import defaultdict
+
+from common import MD5_HASHERS, QueryCounter, setup_django
+
+CONFIGURATIONS = {
+    'avant': ('db', 'django.contrib.messages.storage.fallback.FallbackStorage'),
+    'db': ('db', 'django.contrib.messages.storage.cookie.CookieStorage'),
+    'cached_db': ('cached_db', 'django.contrib.messages.storage.cookie.CookieStorage'),
+    'cache': ('cache', 'django.contrib.messages.storage.cookie.CookieStorage'),
+    'signed_cookies': ('signed_cookies', 'django.contrib.messages.storage.cookie.CookieStorage'),
+}
+WRITES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class WriteCounter(QueryCounter):
+    """Compte aussi les requêtes qui écrivent."""
+
+    def __init__(self, connection=None):
+        super().__init__(connection)
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(WRITES):
+            self.writes += 1
+        return super().__call__(execute, sql, params, many, context)
+
+
+def play(iterations, username, password, media_ids):
+    from django.test import Client
+    from django.urls import reverse
+    from mediatheque.models import MediathequeBorrow
+
+    # Client créé sous la configuration courante : ses middlewares lisent SESSION_ENGINE
+    client = Client()
+    samples = defaultdict(list)
+
+    def timed(label, method, path, data=None):
+        with WriteCounter() as counter:
+            response = getattr(client, method)(path, data or {})
+        samples[label].append((counter.elapsed, counter.count, counter.writes))
+        return response
+
+    for media_id in media_ids[:iterations]:
+        timed('login', 'post', reverse('authentification:login'), {'username': username, 'password': password})
+        timed('staff_dashboard', 'get', reverse('authentification:espace_staff'))
+        timed('borrow', 'post', reverse('borrow_media', args=[media_id]))
+        borrow_id = MediathequeBorrow.objects.filter(media_id=media_id, is_returned=False).values_list(
+            'pk', flat=True).get()
+        timed('return', 'post', reverse('return_media', args=[borrow_id]))
+        timed('logout', 'get', reverse('authentification:logout'))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.test.utils import override_settings
+    from datagen import PASSWORD, STAFF_USERNAME, generate
+    from mediatheque.models import Media
+
+    settings.ALLOWED_HOSTS = ['localhost', 'testserver']
+    settings.DEBUG = False
+    # Hachage MD5 : seules les écritures de session et de messages varient
+    settings.PASSWORD_HASHERS = MD5_HASHERS
+    generate(members=50, media=args.iterations * 2, loans=0, staff=1)
+    media_ids = list(Media.objects.filter(available=True, can_borrow=True).exclude(
+        media_type='board_game').order_by('pk').values_list('pk', flat=True))
+
+    for name, (profile, message_storage) in CONFIGURATIONS.items():
+        caches['sessions'].clear()
+        with override_settings(SESSION_ENGINE=settings.SESSION_PROFILES[profile], MESSAGE_STORAGE=message_storage):
+            started = time.perf_counter()
+            samples = play(args.iterations, STAFF_USERNAME.format(0), PASSWORD, media_ids)
+            elapsed = time.perf_counter() - started
+        print(f"{name} ({elapsed:.2f} s)")
+        for label, values in samples.items():
+            count = len(values)
+            print(f"  {label:16} {sum(v[0] for v in values) / count * 1000:7.2f} ms   "
+                  f"{sum(v[1] for v in values) / count:5.1f} req. SQL   {sum(v[2] for v in values) / count:4.1f} écritures")
+
+
+if __name__ == '__main__':
+    main()
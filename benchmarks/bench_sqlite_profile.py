@@ -0,0 +1,120 @@
+"""
+Charge concurrente lectures/écritures sur SQLite, profil 'default' puis 'production'.
+
+Des processus lecteurs parcourent le catalogue (page de 50 médias + emprunts en cours)
+pendant que des processus écrivains empruntent puis rendent des médias. Chaque profil
+tourne sur sa propre copie de la même base migrée.
+
+    python benchmarks/bench_sqlite_profile.py [--readers 4] [--writers 2] [--seconds 10]
+"""
+import argparse
+import multiprocessing
+import random
+import shutil
+import time
+
+from common import percentile, setup_django
+
+
+def worker(kind, deadline, user_ids, media_ids, queue):
+    # Processus séparé (comme un worker gunicorn) : pas de GIL partagé entre lecteurs et écrivains
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError
+    from mediatheque import borrowing
+    from mediatheque.models import Media, MediathequeBorrow
+
+    rng = random.Random()
+    timings, locked = [], 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            if kind == 'reads':
+                list(Media.objects.filter_catalogue(available=True).order_by('name', 'id')[:50])
+                list(MediathequeBorrow.objects.filter(is_returned=False).select_related('media')[:50])
+            else:
+                user = get_user_model()(pk=rng.choice(user_ids))
+                borrow = borrowing.borrow_media(user, rng.choice(media_ids))
+                borrowing.return_borrow(borrow.pk)
+        except borrowing.BorrowError:
+            continue
+        except OperationalError:
+            locked += 1
+            continue
+        timings.append(time.perf_counter() - started)
+    queue.put((kind, timings, locked))
+
+
+def run_profile(profile, db_path, args):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from mediatheque.models import Media
+
+    settings.SQLITE_PROFILE = profile
+    database = settings.DATABASES['default']
+    database['NAME'] = db_path
+    database['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'} if profile == 'production' else {}
+
+    user_ids = list(get_user_model().objects.values_list('pk', flat=True))
+    media_ids = list(Media.objects.values_list('pk', flat=True))
+    # Aucune connexion ouverte ne doit être héritée par les processus fils
+    connections.close_all()
+
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    deadline = time.time() + args.seconds
+    processes = [
+        context.Process(target=worker, args=(kind, deadline, user_ids, media_ids, queue))
+        for kind, count in (('reads', args.readers), ('writes', args.writers)) for _ in range(count)
+    ]
+    for process in processes:
+        process.start()
+    results = {'reads': [], 'writes': [], 'locked': 0}
+    for _ in processes:
+        kind, timings, locked = queue.get()
+        results[kind].extend(timings)
+        results['locked'] += locked
+    for process in processes:
+        process.join()
+
+    print(f"Profil {profile} ({args.readers} lecteurs, {args.writers} écrivains, {args.seconds} s)")
+    for kind, label in (('reads', 'lectures'), ('writes', 'emprunts+retours')):
+        timings = results[kind]
+        print(f"  {label:17}: {len(timings) / args.seconds:8.0f} /s   "
+              f"p50 {percentile(timings, 50) * 1000:7.1f} ms   p99 {percentile(timings, 99) * 1000:7.1f} ms")
+    print(f"  « database is locked » : {results['locked']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--media', type=int, default=5000)
+    parser.add_argument('--members', type=int, default=500)
+    args = parser.parse_args()
+    template = setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from mediatheque.content_types import content_type_id_for
+    from mediatheque.models import Media
+
+    content_type_id = content_type_id_for(Media)
+    Media.objects.bulk_create([
+        Media(name=f'Média {i:05}', media_type='book', content_type_id=content_type_id)
+        for i in range(args.media)
+    ], batch_size=500)
+    get_user_model().objects.bulk_create([
+        get_user_model()(username=f'membre{i}') for i in range(args.members)
+    ], batch_size=500)
+    connections.close_all()
+
+    for profile in ('default', 'production'):
+        db_path = template.with_name(f'{profile}.sqlite3')
+        shutil.copyfile(template, db_path)
+        run_profile(profile, db_path, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Outils communs des benchmarks : configuration de Django sur une base SQLite jetable,
+comptage des requêtes SQL, percentiles et serveur WSGI multi-thread dans le processus.
+
+Les scripts se lancent depuis la racine du dépôt : python benchmarks/<script>.py
+"""
+import math
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / 'mediatheque')]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mediatheque.settings')
+
+# Hachage MD5 des benchmarks, absent de PASSWORD_PROFILES (réservé aux tests et mesures)
+MD5_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def setup_django(db_path=None):
+    # Crée (ou réutilise) une base SQLite dédiée au benchmark et la migre
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    db_path = Path(db_path) if db_path else Path(tempfile.mkdtemp(prefix='mediatheque-bench-')) / 'bench.sqlite3'
+    settings.DATABASES['default']['NAME'] = db_path
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+class QueryCounter:
+    """Compte les requêtes exécutées dans le bloc (sans les conserver en mémoire)."""
+
+    def __init__(self, connection=None):
+        from django.db import connection as default_connection
+        self.connection = connection or default_connection
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._started
+        self._wrapper.__exit__(*exc_info)
+
+
+def percentile(values, p):
+    # Rang le plus proche, comme mediatheque.instrumentation
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # File d'attente assez longue pour de nombreux clients simultanés
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve_wsgi(application):
+    """Sert `application` sur 127.0.0.1 (un thread par connexion) ; renvoie le port."""
+    port = free_port()
+    server = make_server('127.0.0.1', port, application,
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield port
+    finally:
+        server.shutdown()
+        server.server_close()
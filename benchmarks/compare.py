@@ -0,0 +1,57 @@
+"""
+Compare deux résultats de run.py (typiquement deux commits) : latences, débit et
+requêtes SQL par requête HTTP, avec l'écart relatif.
+
+Le code de sortie vaut 1 si une latence p95 ou un nombre de requêtes SQL se dégrade
+au-delà du seuil.
+
+    python benchmarks/compare.py avant.json après.json [--threshold 10]
+"""
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ['rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request']
+# Métriques dont la hausse est une régression
+WATCHED = {'p95_ms', 'queries_per_request'}
+
+
+def delta(before, after):
+    if not before:
+        return 0.0 if not after else float('inf')
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10, help="Dégradation tolérée, en %%")
+    args = parser.parse_args()
+    before, after = (json.loads(Path(path).read_text()) for path in (args.before, args.after))
+
+    print(f"avant : {(before.get('commit') or '?')[:12]}   après : {(after.get('commit') or '?')[:12]}")
+    regressions = []
+    for driver, results in after['results'].items():
+        for label, stats in results.items():
+            reference = before['results'].get(driver, {}).get(label)
+            if reference is None:
+                print(f"{driver:6} {label:16} (absent de {args.before})")
+                continue
+            cells = []
+            for metric in METRICS:
+                change = delta(reference[metric], stats[metric])
+                flag = ''
+                if metric in WATCHED and change > args.threshold:
+                    flag = ' !'
+                    regressions.append((driver, label, metric))
+                cells.append(f"{metric} {reference[metric]:g} -> {stats[metric]:g} ({change:+.0f}%){flag}")
+            print(f"{driver:6} {label:16} " + '   '.join(cells))
+
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:g} %")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Jeu de données des benchmarks : N membres, M médias répartis entre Book, DVD, CD et
+BoardGame, K emprunts historiques (rendus) et quelques emprunts en cours, dont
+certains en retard. Les comptes staff (un par client simulé) sont créés à part.
+
+Le tirage est déterministe (--seed) : deux commits comparés travaillent sur les mêmes
+données.
+
+    python benchmarks/datagen.py --db /tmp/bench.sqlite3 [--members 500] [--media 10000] [--loans 20000]
+"""
+import argparse
+import random
+from datetime import timedelta
+
+from common import setup_django
+
+PASSWORD = 'bench-password'
+STAFF_USERNAME = 'bench-staff-{}'
+MEMBER_USERNAME = 'bench-member-{}'
+
+MEDIA_TYPES = ['book', 'dvd', 'cd', 'board_game']
+# Champ propre à chaque sous-classe, rempli par le générateur
+CREATOR_FIELDS = {'book': 'author', 'dvd': 'producer', 'cd': 'artist', 'board_game': 'creators'}
+WORDS = ['soleil', 'nuit', 'voyage', 'jardin', 'rivière', 'mémoire', 'étoile', 'hiver',
+         'silence', 'forêt', 'océan', 'ville', 'secret', 'lumière', 'montagne', 'chemin']
+
+
+def _title(rng, i):
+    return f"{' '.join(rng.sample(WORDS, 3)).capitalize()} {i}"
+
+
+def create_users(members, staff, rng):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import Group
+
+    User = get_user_model()
+    # Un seul hachage pour tous les comptes : le hacheur coûte plusieurs centaines de ms
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        [User(username=MEMBER_USERNAME.format(i), password=password, role='client') for i in range(members)]
+        # Superutilisateurs : les vues staff vérifient des permissions qui ne passent que pour eux
+        + [User(username=STAFF_USERNAME.format(i), password=password, role='staff', is_staff=True,
+                is_superuser=True) for i in range(staff)],
+        batch_size=500,
+    )
+    for name, role in (('client', 'client'), ('staff', 'staff')):
+        group = Group.objects.get_or_create(name=name)[0]
+        group.user_set.add(*User.objects.filter(role=role).values_list('pk', flat=True))
+
+
+def create_media(count, rng):
+    from mediatheque.importer import DEFAULT_CHUNK_SIZE, chunked, validate_chunk, write_chunk
+
+    rows = (
+        (i, {'media_type': media_type, 'name': _title(rng, i),
+             CREATOR_FIELDS[media_type]: f'Auteur {rng.randrange(count // 10 + 1)}'})
+        for i, media_type in ((i, MEDIA_TYPES[i % len(MEDIA_TYPES)]) for i in range(count))
+    )
+    # Même chemin que la commande import_media : INSERT groupés et index de recherche
+    for chunk in chunked(rows, DEFAULT_CHUNK_SIZE):
+        valid, errors = validate_chunk(chunk)
+        assert not errors, errors
+        write_chunk(valid)
+
+
+def create_loans(count, active, rng):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.utils import timezone
+    from mediatheque.borrowing import BORROW_DURATION_DAYS, reconcile_borrow_counters
+    from mediatheque.models import Media, MediathequeBorrow
+
+    User = get_user_model()
+    now = timezone.now()
+    members = list(User.objects.filter(role='client').values_list('pk', flat=True))
+    media_ids = list(Media.objects.exclude(media_type='board_game').values_list('pk', flat=True))
+    duration = timedelta(days=BORROW_DURATION_DAYS)
+
+    borrows = []
+    for _ in range(count):
+        borrow_date = now - timedelta(days=rng.uniform(8, 3 * 365))
+        borrows.append(MediathequeBorrow(
+            user_id=rng.choice(members), media_id=rng.choice(media_ids), borrow_date=borrow_date,
+            due_date=borrow_date + duration, is_returned=True,
+            return_date=borrow_date + timedelta(days=rng.uniform(1, BORROW_DURATION_DAYS + 3)),
+        ))
+
+    # Emprunts en cours : un média et au plus un emprunt par membre, un sur cinq en retard
+    borrowed = rng.sample(media_ids, min(active, len(media_ids), len(members)))
+    for member, media_id in zip(rng.sample(members, len(borrowed)), borrowed):
+        borrow_date = now - timedelta(days=rng.uniform(0, 2 * BORROW_DURATION_DAYS))
+        borrows.append(MediathequeBorrow(
+            user_id=member, media_id=media_id, borrow_date=borrow_date, due_date=borrow_date + duration,
+            is_late=borrow_date + duration < now,
+        ))
+
+    with transaction.atomic():
+        MediathequeBorrow.objects.bulk_create(borrows, batch_size=1000)
+        Media.objects.filter(pk__in=borrowed).update(available=False)
+        reconcile_borrow_counters()
+
+
+def generate(members=500, media=10000, loans=20000, active=None, staff=32, seed=0):
+    """Remplit la base courante ; renvoie la description du jeu de données (pour le JSON)."""
+    from mediatheque.caching import reset_version
+
+    rng = random.Random(seed)
+    active = members // 5 if active is None else active
+    create_users(members, staff, rng)
+    create_media(media, rng)
+    create_loans(loans, active, rng)
+    reset_version()
+    return {'members': members, 'media': media, 'loans': loans, 'active_loans': active, 'staff': staff,
+            'seed': seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', help="Fichier SQLite à créer (dossier temporaire par défaut)")
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--media', type=int, default=10000)
+    parser.add_argument('--loans', type=int, default=20000)
+    parser.add_argument('--active', type=int, help="Emprunts en cours (un membre sur cinq par défaut)")
+    parser.add_argument('--staff', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    db_path = setup_django(args.db)
+    data = generate(args.members, args.media, args.loans, args.active, args.staff, args.seed)
+    print(f"{db_path} : {data}")
+
+
+if __name__ == '__main__':
+    main()
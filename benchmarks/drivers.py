@@ -0,0 +1,131 @@
+"""
+Pilotes des scénarios : le client de test de Django (dans le thread appelant) et un
+client HTTP face au serveur WSGI multi-thread lancé dans le processus.
+
+Une session expose request(method, path, data) -> (statut HTTP, requêtes SQL).
+"""
+import http.client
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from common import QueryCounter, serve_wsgi
+
+# En-tête ajouté par count_queries : requêtes SQL exécutées pour la réponse
+QUERIES_HEADER = 'X-Bench-Queries'
+
+
+class ClientSession:
+    def __init__(self, user=None):
+        from django.test import Client
+
+        self.client = Client()
+        if user is not None:
+            self.client.force_login(user)
+
+    def request(self, method, path, data=None):
+        # Le client de test exécute la vue dans ce thread : le compteur voit ses requêtes
+        with QueryCounter() as counter:
+            if method == 'POST':
+                response = self.client.post(path, data or {})
+            else:
+                response = self.client.get(path)
+        return response.status_code, counter.count
+
+    def close(self):
+        pass
+
+
+class ClientDriver:
+    name = 'client'
+
+    @contextmanager
+    def running(self):
+        yield self
+
+    def session(self, user=None):
+        return ClientSession(user)
+
+
+def count_queries(application):
+    """Application WSGI qui renvoie le nombre de requêtes SQL dans QUERIES_HEADER."""
+    def wrapper(environ, start_response):
+        captured = []
+        # Le gestionnaire de Django produit tout le corps avant de rendre la main
+        with QueryCounter() as counter:
+            body = application(environ, lambda *args: captured.append(args))
+        status, headers, *exc_info = captured[0]
+        start_response(status, headers + [(QUERIES_HEADER, str(counter.count))], *exc_info)
+        return body
+    return wrapper
+
+
+class HTTPSession:
+    """Connexion HTTP/1.1 persistante avec ses cookies (session, jeton CSRF)."""
+
+    def __init__(self, port, cookies):
+        self.port = port
+        self.cookies = dict(cookies)
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def request(self, method, path, data=None):
+        from django.conf import settings
+
+        headers = {'Host': 'localhost'}
+        body = None
+        if method == 'POST':
+            body = urlencode({**(data or {}), 'csrfmiddlewaretoken': self.cookies[settings.CSRF_COOKIE_NAME]})
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Connexion perdue (serveur saturé) : comptée en erreur, la suivante repart de zéro
+            self.connection.close()
+            return 599, 0
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                if morsel['max-age'] == '0':
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+        return response.status, int(response.getheader(QUERIES_HEADER, 0))
+
+    def close(self):
+        self.connection.close()
+
+
+class WSGIDriver:
+    name = 'wsgi'
+
+    def __init__(self):
+        self.port = None
+
+    @contextmanager
+    def running(self):
+        from django.core.wsgi import get_wsgi_application
+
+        with serve_wsgi(count_queries(get_wsgi_application())) as port:
+            self.port = port
+            yield self
+
+    def session(self, user=None):
+        from django.conf import settings
+        from django.test import Client
+        from django.utils.crypto import get_random_string
+
+        # Jeton CSRF posé d'avance (secret non masqué, accepté tel quel par le middleware)
+        cookies = {settings.CSRF_COOKIE_NAME: get_random_string(32)}
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            cookies[settings.SESSION_COOKIE_NAME] = client.cookies[settings.SESSION_COOKIE_NAME].value
+        return HTTPSession(self.port, cookies)
+
+
+DRIVERS = {
+    'client': ClientDriver,
+    'wsgi': WSGIDriver,
+}
@@ -0,0 +1,162 @@
+"""
+Suite de benchmarks de bout en bout : génère le jeu de données (voir datagen.py) puis
+joue chaque scénario (connexion, consultation de media_list, emprunt et retour,
+tableau de bord staff) avec le client de test de Django et avec N clients HTTP
+concurrents face au serveur WSGI du processus.
+
+Les scénarios sont joués l'un après l'autre ; chaque client en exécute --iterations
+itérations. Le résultat JSON (p50/p95/p99, requêtes SQL par requête HTTP, débit) se
+compare entre deux commits avec compare.py.
+
+    python benchmarks/run.py [--output results.json] [--workers 8] [--iterations 20]
+    python benchmarks/compare.py avant.json après.json
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from common import ROOT, percentile, setup_django
+from drivers import DRIVERS
+from scenarios import SCENARIOS, Worker
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return {'commit': git('rev-parse', 'HEAD') or None, 'dirty': bool(git('status', '--porcelain'))}
+
+
+def summarize(samples, elapsed):
+    timings = [duration for duration, _, ok in samples if ok]
+    queries = [count for _, count, ok in samples if ok]
+    return {
+        'requests': len(samples),
+        'errors': len(samples) - len(timings),
+        'rps': round(len(timings) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 2) if timings else 0.0,
+        'p50_ms': round(percentile(timings, 50) * 1000, 2),
+        'p95_ms': round(percentile(timings, 95) * 1000, 2),
+        'p99_ms': round(percentile(timings, 99) * 1000, 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+    }
+
+
+def run_scenario(workers, scenario, iterations):
+    def play(worker):
+        for _ in range(iterations):
+            scenario(worker)
+
+    # Le débit d'un libellé est rapporté à la durée de tout le scénario
+    for worker in workers:
+        worker.samples.clear()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=play, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged = {}
+    for worker in workers:
+        for label, samples in worker.samples.items():
+            merged.setdefault(label, []).extend(samples)
+    return {label: summarize(samples, elapsed) for label, samples in merged.items()}
+
+
+def run_driver(driver, workers_count, scenarios, iterations, members):
+    from django.contrib.auth import get_user_model
+    from mediatheque.models import Media
+    from datagen import STAFF_USERNAME
+
+    User = get_user_model()
+    staff = list(User.objects.filter(username__in=[STAFF_USERNAME.format(i) for i in range(workers_count)]))
+    if len(staff) < workers_count:
+        raise SystemExit(f"{workers_count} clients demandés, {len(staff)} comptes staff générés (--staff)")
+    # Médias empruntables répartis entre les clients
+    media_ids = list(Media.objects.filter(available=True, can_borrow=True).exclude(
+        media_type='board_game').order_by('pk').values_list('pk', flat=True))
+
+    results = {}
+    with driver.running():
+        workers = [Worker(driver, user, media_ids[i::workers_count], members, seed=i)
+                   for i, user in enumerate(staff)]
+        for name in scenarios:
+            results.update(run_scenario(workers, SCENARIOS[name], iterations))
+        for worker in workers:
+            worker.close()
+    return results
+
+
+def print_results(driver_name, results):
+    for label, stats in results.items():
+        print(f"  {driver_name:6} {label:16} {stats['rps']:7.1f} req/s   p50 {stats['p50_ms']:7.1f} ms   "
+              f"p95 {stats['p95_ms']:7.1f} ms   p99 {stats['p99_ms']:7.1f} ms   "
+              f"{stats['queries_per_request']:5.1f} req. SQL   erreurs {stats['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="Fichier JSON des résultats")
+    parser.add_argument('--db', help="Base déjà générée par datagen.py (générée à la volée sinon)")
+    parser.add_argument('--drivers', default='client,wsgi', help="Pilotes parmi : " + ', '.join(DRIVERS))
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="Scénarios parmi : " + ', '.join(SCENARIOS))
+    parser.add_argument('--workers', type=int, default=8, help="Clients HTTP concurrents (pilote wsgi)")
+    parser.add_argument('--client-workers', type=int, default=1, help="Threads du client de test")
+    parser.add_argument('--iterations', type=int, default=20, help="Itérations de chaque scénario par client")
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--media', type=int, default=10000)
+    parser.add_argument('--loans', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    drivers = args.drivers.split(',')
+    scenarios = args.scenarios.split(',')
+    unknown = set(drivers) - set(DRIVERS) | set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"inconnu : {', '.join(sorted(unknown))}")
+
+    reuse = args.db is not None and Path(args.db).exists()
+    db_path = setup_django(args.db)
+
+    import django
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from datagen import generate
+
+    settings.ALLOWED_HOSTS = ['localhost', 'testserver']
+    settings.DEBUG = False
+    staff = max(args.workers, args.client_workers)
+    if reuse:
+        data = {'members': get_user_model().objects.filter(role='client').count(), 'reused': str(db_path)}
+    else:
+        data = generate(args.members, args.media, args.loans, staff=staff, seed=args.seed)
+
+    output = {
+        **git_revision(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {'python': platform.python_version(), 'django': django.get_version(),
+                        'sqlite': sqlite3.sqlite_version, 'sqlite_profile': settings.SQLITE_PROFILE,
+                        'password_profile': settings.PASSWORD_PROFILE},
+        'config': {'workers': args.workers, 'client_workers': args.client_workers,
+                   'iterations': args.iterations, 'scenarios': scenarios, 'data': data},
+        'results': {},
+    }
+    for name in drivers:
+        workers = args.client_workers if name == 'client' else args.workers
+        results = run_driver(DRIVERS[name](), workers, scenarios, args.iterations, data['members'])
+        output['results'][name] = results
+        print_results(name, results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(output, indent=2, ensure_ascii=False) + '\n')
+        print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
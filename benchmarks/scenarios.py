@@ -0,0 +1,95 @@
+"""
+Scénarios scriptés : une itération d'un scénario envoie une ou plusieurs requêtes,
+chacune mesurée sous son propre libellé par Worker.timed.
+"""
+import random
+import time
+from collections import defaultdict
+from itertools import cycle
+from urllib.parse import urlencode
+
+from datagen import MEMBER_USERNAME, PASSWORD
+
+CATALOGUE_FILTERS = [{}, {'media_type': 'book'}, {'media_type': 'dvd'}, {'media_type': 'cd'},
+                     {'media_type': 'board_game'}, {'available': 'true'}, {'media_type': 'book', 'available': 'false'}]
+
+
+class Worker:
+    """Client simulé : un compte staff connecté, sa part des médias empruntables, ses mesures."""
+
+    def __init__(self, driver, user, media_ids, members, seed):
+        self.driver = driver
+        self.user = user
+        self.session = driver.session(user)
+        self.media_ids = cycle(media_ids)
+        self.members = members
+        self.rng = random.Random(seed)
+        # libellé -> [(durée, requêtes SQL, succès)]
+        self.samples = defaultdict(list)
+
+    def timed(self, label, session, method, path, data=None):
+        started = time.perf_counter()
+        status, queries = session.request(method, path, data)
+        self.samples[label].append((time.perf_counter() - started, queries, status < 400))
+        return status
+
+    def fail_last(self, label):
+        elapsed, queries, _ = self.samples[label][-1]
+        self.samples[label][-1] = (elapsed, queries, False)
+
+    def close(self):
+        from django.db import connection
+
+        self.session.close()
+        connection.close()
+
+
+def login(worker):
+    from django.urls import reverse
+
+    # Nouveau visiteur : page de connexion puis envoi du formulaire
+    session = worker.driver.session()
+    path = reverse('authentification:login')
+    worker.timed('login_page', session, 'GET', path)
+    username = MEMBER_USERNAME.format(worker.rng.randrange(worker.members))
+    if worker.timed('login', session, 'POST', path, {'username': username, 'password': PASSWORD}) != 302:
+        worker.fail_last('login')
+    session.close()
+
+
+def browse(worker):
+    from django.urls import reverse
+
+    filters = worker.rng.choice(CATALOGUE_FILTERS)
+    worker.timed('browse', worker.session, 'GET', f"{reverse('media_list')}?{urlencode(filters)}")
+
+
+def borrow_return(worker):
+    from django.urls import reverse
+    from mediatheque.models import MediathequeBorrow
+
+    # Chaque client a ses propres médias : pas de refus dû à un autre client
+    media_id = next(worker.media_ids)
+    worker.timed('borrow', worker.session, 'POST', reverse('borrow_media', args=[media_id]))
+    borrow_id = MediathequeBorrow.objects.filter(
+        user_id=worker.user.pk, media_id=media_id, is_returned=False
+    ).values_list('pk', flat=True).first()
+    if borrow_id is None:
+        # La vue redirige aussi en cas de refus : l'emprunt absent signale l'échec
+        worker.fail_last('borrow')
+        return
+    worker.timed('return', worker.session, 'POST', reverse('return_media', args=[borrow_id]))
+
+
+def staff_dashboard(worker):
+    from django.urls import reverse
+
+    worker.timed('staff_dashboard', worker.session, 'GET', reverse('authentification:espace_staff'))
+
+
+SCENARIOS = {
+    'login': login,
+    'browse': browse,
+    'borrow_return': borrow_return,
+    'staff_dashboard': staff_dashboard,
+}
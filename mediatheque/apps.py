@@ -0,0 +1,59 @@
+from django.apps import AppConfig, apps
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, post_delete
+
+
+class MediathequeConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mediatheque'
+
+    def ready(self):
+        from .models import Media
+        from . import search
+        from .borrowing import BORROW_MODELS, release_deleted_borrow
+        from .caching import bump_version, reset_version
+        from .content_types import clear_content_type_ids
+        from .sqlite import apply_sqlite_profile
+
+        # PRAGMA du profil SQLite choisi (settings.SQLITE_PROFILE), à chaque nouvelle connexion
+        connection_created.connect(apply_sqlite_profile, dispatch_uid='mediatheque_sqlite_profile')
+
+        # Récepteurs branchés modèle par modèle (sender) : un récepteur global de post_delete
+        # priverait tous les modèles de la suppression rapide du Collector (sessions...)
+        media_models = [model for model in apps.get_models() if issubclass(model, Media)]
+        borrow_models = [model for model in apps.get_models()
+                         if model._meta.concrete_model._meta.label in BORROW_MODELS]
+
+        # Maintient l'index de recherche plein texte à jour pour Media et ses sous-classes
+        def update_search_index(sender, instance, **kwargs):
+            search.index_media(instance.pk)
+
+        def remove_from_search_index(sender, instance, **kwargs):
+            search.unindex_media(instance.pk)
+
+        for model in media_models:
+            post_save.connect(update_search_index, sender=model,
+                              dispatch_uid=f'mediatheque_search_index_save.{model._meta.label}')
+            post_delete.connect(remove_from_search_index, sender=model,
+                                dispatch_uid=f'mediatheque_search_index_delete.{model._meta.label}')
+
+        # Toute écriture sur le catalogue ou les emprunts invalide les tableaux de bord en cache
+        def invalidate_cached_data(sender, using=None, **kwargs):
+            bump_version(using=using)
+
+        for model in media_models + borrow_models:
+            post_save.connect(invalidate_cached_data, sender=model,
+                              dispatch_uid=f'mediatheque_cache_version_save.{model._meta.label}')
+            post_delete.connect(invalidate_cached_data, sender=model,
+                                dispatch_uid=f'mediatheque_cache_version_delete.{model._meta.label}')
+
+        # Compteurs d'emprunts des membres : un emprunt en cours supprimé est décompté
+        for model in borrow_models:
+            post_delete.connect(release_deleted_borrow, sender=model,
+                                dispatch_uid=f'mediatheque_borrow_counters_delete.{model._meta.label}')
+
+        # Après migrate ou flush, la base ne correspond plus à rien de ce qui est en cache
+        post_migrate.connect(reset_version, dispatch_uid='mediatheque_cache_version_migrate')
+
+        # Les ContentType mis en cache sont invalidés après chaque migrate (et flush des tests)
+        post_migrate.connect(clear_content_type_ids, dispatch_uid='mediatheque_clear_content_type_ids')
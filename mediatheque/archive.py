@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from mediatheque.models import ArchivedBorrow, MediathequeBorrow
+
+DEFAULT_CHUNK_SIZE = 1000
+# Ancienneté (jours depuis le retour) au-delà de laquelle un emprunt rendu est archivé
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+
+# Colonnes recopiées telles quelles, id compris
+ARCHIVED_COLUMNS = [field.column for field in MediathequeBorrow._meta.concrete_fields]
+
+
+def _move_sql(ids):
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(column) for column in ARCHIVED_COLUMNS)
+    placeholders = ', '.join(['%s'] * len(ids))
+    insert = 'INSERT INTO {} ({}, {}) SELECT {}, %s FROM {} WHERE {} IN ({})'.format(
+        quote(ArchivedBorrow._meta.db_table), columns, quote('archived_at'), columns,
+        quote(MediathequeBorrow._meta.db_table), quote('id'), placeholders,
+    )
+    delete = 'DELETE FROM {} WHERE {} IN ({})'.format(
+        quote(MediathequeBorrow._meta.db_table), quote('id'), placeholders,
+    )
+    return insert, delete
+
+
+def archive_returned_borrows(before=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Déplace vers ArchivedBorrow les emprunts rendus avant `before` (par défaut il y a
+    DEFAULT_ARCHIVE_AFTER_DAYS jours), lot par lot.
+
+    Chaque lot est recopié (INSERT ... SELECT) puis supprimé par deux requêtes dans sa
+    propre transaction, sans signal par ligne : aucune vue en cache ne montre d'emprunt
+    rendu. Le parcours suit la clé primaire (AUTOINCREMENT : SQLite ne réattribue pas les
+    ids déplacés aux emprunts suivants).
+    Renvoie le nombre d'emprunts archivés.
+    """
+    before = before or timezone.now() - timedelta(days=DEFAULT_ARCHIVE_AFTER_DAYS)
+    candidates = MediathequeBorrow.objects.filter(
+        is_returned=True, return_date__lt=before,
+    ).order_by('pk').values_list('pk', flat=True)
+    total = 0
+    cursor_id = 0
+    while True:
+        with transaction.atomic():
+            ids = list(candidates.filter(pk__gt=cursor_id)[:chunk_size])
+            if not ids:
+                break
+            insert, delete = _move_sql(ids)
+            with connection.cursor() as cursor:
+                cursor.execute(insert, [timezone.now(), *ids])
+                cursor.execute(delete, ids)
+            total += len(ids)
+            cursor_id = ids[-1]
+    return total
+
+
+def borrow_history(*fields, **lookups):
+    """
+    Emprunts en cours et archivés répondant à `lookups`, en tuples `fields` (UNION ALL).
+
+    Mêmes noms de champs et de relations dans les deux tables : borrow_history('id',
+    'media__name', user=user) ; order_by() et iterator() s'appliquent au résultat réuni.
+    """
+    return MediathequeBorrow.objects.filter(**lookups).values_list(*fields).union(
+        ArchivedBorrow.objects.filter(**lookups).values_list(*fields), all=True,
+    )
+
+
+def member_history(user, fields=('id', 'media_id', 'media__name', 'borrow_date', 'due_date', 'return_date',
+                                 'is_returned', 'is_late')):
+    # Historique complet d'un membre, du plus récent au plus ancien
+    return borrow_history(*fields, user=user).order_by('-borrow_date', '-id')
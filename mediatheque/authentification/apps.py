@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 
 
 class AuthenticationConfig(AppConfig):
@@ -8,35 +8,21 @@ class AuthenticationConfig(AppConfig):
 
     def ready(self):
         from django.contrib.auth.models import Group, Permission
-        from django.contrib.contenttypes.models import ContentType
         from .models import CustomUser
-
-        def create_groups_and_permissions(sender, **kwargs):
-            staff_group, _ = Group.objects.get_or_create(name='staff')
-            client_group, _ = Group.objects.get_or_create(name='client')
-
-            content_type = ContentType.objects.get_for_model(CustomUser)
-
-            permissions_staff = [
-                ('can_add_member', 'Can add members'),
-                ('can_update_member', 'Can update members'),
-                ('can_view_members', 'Can view members'),
-                ('can_add_media', 'Can add media'),
-                ('can_return_media', 'Can return media'),
-                ('can_borrow_media', 'Can borrow media'),
-                ('can_view_media', 'Can view media'),
-            ]
-
-            for codename, name in permissions_staff:
-                perm, created = Permission.objects.get_or_create(
-                    codename=codename,
-                    name=name,
-                    content_type=content_type,
-                )
-                if created:
-                    staff_group.permissions.add(perm)
-
-                if codename == 'can_view_media':  # La permission partagée
-                    client_group.permissions.add(perm)
-
-        post_migrate.connect(create_groups_and_permissions, sender=self)
+        from .permissions import bootstrap_permissions
+        from .roles import invalidate_access, reset_access
+
+        # Groupes et permissions déclarés dans permissions.py
+        post_migrate.connect(bootstrap_permissions, sender=self,
+                             dispatch_uid='authentification.bootstrap_permissions')
+
+        # Groupes et permissions en cache (voir roles.py) : invalidés à chaque modification
+        for model in (Group, Permission):
+            post_save.connect(invalidate_access, sender=model,
+                              dispatch_uid=f'authentification.access_save.{model.__name__}')
+            post_delete.connect(invalidate_access, sender=model,
+                                dispatch_uid=f'authentification.access_delete.{model.__name__}')
+        for through in (CustomUser.groups.through, CustomUser.user_permissions.through, Group.permissions.through):
+            m2m_changed.connect(invalidate_access, sender=through,
+                                dispatch_uid=f'authentification.access_m2m.{through.__name__}')
+        post_migrate.connect(reset_access, dispatch_uid='authentification.access_migrate')
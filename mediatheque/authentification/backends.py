@@ -0,0 +1,20 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .roles import aget_access, get_access
+
+
+class RoleBackend(ModelBackend):
+    """
+    ModelBackend dont les permissions viennent de authentification.roles : permission_required
+    et has_perm lisent le même chargement, mis en cache, que les vérifications de groupe.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return get_access(user_obj)['permissions']
+
+    async def aget_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return (await aget_access(user_obj))['permissions']
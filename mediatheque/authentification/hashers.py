@@ -0,0 +1,20 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+# Coûts réglés pour un serveur à peu de cœurs : chaque connexion hache une fois le mot
+# de passe, le coût choisi borne donc le débit de login_view (voir benchmarks/bench_login.py).
+# Les hachages existants gardent leurs paramètres et sont refaits à la connexion suivante.
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    # Argon2id, 19 Mio, 2 passes, 1 fil : minimum recommandé par l'OWASP
+    time_cost = 2
+    memory_cost = 19 * 1024
+    parallelism = 1
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    # N=2^15, r=8, p=1 : 32 Mio par hachage (le double du réglage de Django)
+    work_factor = 2 ** 15
+    block_size = 8
+    parallelism = 1
+    maxmem = 64 * 1024 * 1024
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:46
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_borrow_counters(apps, schema_editor):
+    # Initialise les compteurs à partir des emprunts existants
+    CustomUser = apps.get_model('authentification', 'CustomUser')
+    counts = {}
+    for label in ('mediatheque.MediathequeBorrow', 'staff.StaffBorrow'):
+        rows = apps.get_model(label).objects.filter(is_returned=False).values('user').annotate(
+            active=Count('pk'), late=Count('pk', filter=Q(is_late=True))
+        ).order_by()
+        for row in rows:
+            active, late = counts.get(row['user'], (0, 0))
+            counts[row['user']] = (active + row['active'], late + row['late'])
+
+    users = [CustomUser(pk=pk, active_borrow_count=active, late_borrow_count=late)
+             for pk, (active, late) in counts.items()]
+    CustomUser.objects.bulk_update(users, ['active_borrow_count', 'late_borrow_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0001_initial'),
+        ('mediatheque', '0004_overdue_maintenance'),
+        ('staff', '0002_overdue_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='active_borrow_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='late_borrow_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_borrow_counters, migrations.RunPython.noop),
+    ]
@@ -14,6 +14,10 @@ class CustomUser(AbstractUser):
 
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='client')
 
+    # Compteurs dénormalisés des emprunts en cours / en retard (voir mediatheque.borrowing)
+    active_borrow_count = models.PositiveIntegerField(default=0)
+    late_borrow_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return self.username
 
@@ -0,0 +1,66 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Permissions de l'application, rattachées au type de contenu de CustomUser.
+# Ajouter une permission ou la donner à un groupe se fait ici : le bootstrap
+# post_migrate met la base en accord à la prochaine migration.
+PERMISSIONS = [
+    ('can_add_member', 'Can add members'),
+    ('can_update_member', 'Can update members'),
+    ('can_view_members', 'Can view members'),
+    ('can_add_media', 'Can add media'),
+    ('can_return_media', 'Can return media'),
+    ('can_borrow_media', 'Can borrow media'),
+    ('can_view_borrow', 'Can view borrows'),
+    ('can_view_media', 'Can view media'),
+    ('can_export_data', 'Can export data'),
+    ('can_view_stats', 'Can view request statistics'),
+]
+
+# Permissions de chaque groupe : la liste fait foi, le reste est retiré
+GROUP_PERMISSIONS = {
+    'staff': [codename for codename, _ in PERMISSIONS],
+    'client': ['can_view_media'],
+}
+
+
+def bootstrap_permissions(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Crée groupes et permissions manquants et fixe les permissions de chaque groupe.
+
+    Idempotent : une lecture des permissions, une des groupes, puis un set() par groupe.
+    """
+    from django.contrib.auth.models import Group, Permission
+    from django.contrib.contenttypes.models import ContentType
+    from .models import CustomUser
+
+    content_type = ContentType.objects.db_manager(using).get_for_model(CustomUser)
+    permissions = Permission.objects.using(using)
+
+    with transaction.atomic(using=using):
+        existing = {
+            codename: (pk, name)
+            for codename, pk, name in permissions.filter(content_type=content_type)
+            .values_list('codename', 'pk', 'name')
+        }
+        missing = [
+            Permission(codename=codename, name=name, content_type=content_type)
+            for codename, name in PERMISSIONS if codename not in existing
+        ]
+        renamed = [
+            Permission(pk=existing[codename][0], name=name)
+            for codename, name in PERMISSIONS if codename in existing and existing[codename][1] != name
+        ]
+        if missing:
+            # SQLite renvoie les clés des lignes insérées
+            for permission in permissions.bulk_create(missing):
+                existing[permission.codename] = (permission.pk, permission.name)
+        if renamed:
+            permissions.bulk_update(renamed, ['name'])
+
+        groups = {group.name: group for group in Group.objects.using(using).filter(name__in=GROUP_PERMISSIONS)}
+        created = Group.objects.using(using).bulk_create(
+            [Group(name=name) for name in GROUP_PERMISSIONS if name not in groups]
+        )
+        groups.update((group.name, group) for group in created)
+
+        for name, codenames in GROUP_PERMISSIONS.items():
+            groups[name].permissions.set([existing[codename][0] for codename in codenames])
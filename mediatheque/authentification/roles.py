@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.db import router
+from django.db.models import Q
+
+from mediatheque.caching import acurrent_version, bump_version, current_version, get_cache, reset_version
+
+DEFAULTS = {
+    # Durée de vie (s) des groupes et permissions d'un membre en cache ; toute modification
+    # des groupes ou des permissions les invalide avant
+    'TIMEOUT': 60,
+}
+
+ACCESS_VERSION_KEY = 'authentification:access_version'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'ROLE_CACHE', {})}
+
+
+def _make_key(user, version):
+    # Base lue comprise dans la clé, comme pour mediatheque.caching. is_superuser et is_active
+    # aussi : ils changent par un simple save() du membre, qui n'incrémente pas la version
+    flags = f'{user.is_superuser:d}{user.is_active:d}'
+    return f'authentification:access:{router.db_for_read(Group)}:{version}:{user.pk}:{flags}'
+
+
+def _queries(user):
+    groups = Group.objects.filter(user=user).values_list('name', flat=True)
+    permissions = Permission.objects.all() if user.is_superuser else Permission.objects.filter(
+        Q(user=user) | Q(group__user=user)).distinct()
+    return groups, permissions.values_list('content_type__app_label', 'codename').order_by()
+
+
+def _access(user, groups, permissions):
+    # Le rôle vient de la ligne du membre, déjà chargée par la requête
+    return {'role': user.role, 'groups': set(groups),
+            'permissions': {f'{app_label}.{codename}' for app_label, codename in permissions}}
+
+
+def get_access(user):
+    """
+    Rôle, groupes et permissions ('app_label.codename') du membre connecté.
+
+    Chargés une fois par requête (mémorisés sur l'objet user) et gardés en cache
+    ROLE_CACHE['TIMEOUT'] secondes : deux requêtes SQL au plus, aucune ensuite.
+    """
+    if not hasattr(user, '_access'):
+        cache = get_cache()
+        key = _make_key(user, current_version(ACCESS_VERSION_KEY))
+        cached = cache.get(key)
+        if cached is None:
+            groups, permissions = _queries(user)
+            cached = {'groups': list(groups), 'permissions': list(permissions)}
+            cache.set(key, cached, get_config()['TIMEOUT'])
+        user._access = _access(user, cached['groups'], cached['permissions'])
+    return user._access
+
+
+async def aget_access(user):
+    if not hasattr(user, '_access'):
+        cache = get_cache()
+        key = _make_key(user, await acurrent_version(ACCESS_VERSION_KEY))
+        cached = await cache.aget(key)
+        if cached is None:
+            groups, permissions = _queries(user)
+            cached = {'groups': [name async for name in groups],
+                      'permissions': [permission async for permission in permissions]}
+            await cache.aset(key, cached, get_config()['TIMEOUT'])
+        user._access = _access(user, cached['groups'], cached['permissions'])
+    return user._access
+
+
+def in_group(user, name):
+    return user.is_authenticated and name in get_access(user)['groups']
+
+
+async def ain_group(user, name):
+    return user.is_authenticated and name in (await aget_access(user))['groups']
+
+
+def invalidate_access(sender=None, using=None, **kwargs):
+    # Récepteur des signaux sur les groupes, les permissions et leurs liaisons : après le commit
+    if kwargs.get('action', '').startswith('pre_'):
+        return
+    bump_version(using=using, key=ACCESS_VERSION_KEY)
+
+
+def reset_access(**kwargs):
+    # Récepteur post_migrate, comme mediatheque.caching.reset_version
+    reset_version(key=ACCESS_VERSION_KEY)
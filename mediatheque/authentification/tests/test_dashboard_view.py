@@ -2,7 +2,7 @@ import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils import timezone
-from mediatheque.staff.models import Media, Borrow
+from mediatheque.models import Media, MediathequeBorrow as Borrow
 from django.contrib.auth.models import Group
 from django.test import TestCase
 
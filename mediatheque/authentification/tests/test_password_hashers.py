@@ -0,0 +1,43 @@
+import os
+
+import pytest
+from django.conf import settings as project_settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+
+
+@pytest.mark.skipif('MEDIATHEQUE_PASSWORD_PROFILE' in os.environ, reason="profil imposé par l'environnement")
+def test_test_runs_use_the_fast_profile():
+    assert get_hasher().algorithm == 'md5'
+
+
+@pytest.mark.parametrize('profile, algorithm', [('scrypt', 'scrypt'), ('argon2', 'argon2')])
+def test_tuned_profiles_hash_with_their_cost(settings, profile, algorithm):
+    if algorithm == 'argon2':
+        pytest.importorskip('argon2')
+    settings.PASSWORD_HASHERS = project_settings.PASSWORD_PROFILES[profile]
+
+    hasher = get_hasher()
+    assert hasher.algorithm == algorithm
+    encoded = make_password('motdepasse')
+    assert hasher.verify('motdepasse', encoded)
+    assert not hasher.must_update(encoded)
+
+
+@pytest.mark.django_db
+def test_login_rehashes_old_hashes_with_the_profile_hasher(settings):
+    # Compte créé sous le profil par défaut (PBKDF2)
+    user = get_user_model().objects.create_user(username='ancien')
+    user.password = make_password('motdepasse', hasher='pbkdf2_sha256')
+    user.save()
+    settings.PASSWORD_HASHERS = project_settings.PASSWORD_PROFILES['scrypt']
+
+    assert authenticate(username='ancien', password='motdepasse') == user
+    user.refresh_from_db()
+    assert user.password.startswith('scrypt$32768$')
+
+
+def test_no_selectable_profile_hashes_with_md5():
+    # Sinon les hachages PBKDF2 seraient refaits en MD5 à la connexion
+    assert 'fast' not in project_settings.PASSWORD_PROFILES
+    assert not any('MD5' in hasher for hashers in project_settings.PASSWORD_PROFILES.values() for hasher in hashers)
@@ -0,0 +1,42 @@
+import pytest
+from django.contrib.auth.models import Group, Permission
+from authentification.permissions import GROUP_PERMISSIONS, PERMISSIONS, bootstrap_permissions
+
+
+def group_codenames(name):
+    return set(Group.objects.get(name=name).permissions.values_list('codename', flat=True))
+
+
+@pytest.mark.django_db
+def test_bootstrap_creates_declared_groups_and_permissions():
+    # Déjà passé au post_migrate de la base de test
+    assert set(Permission.objects.filter(content_type__app_label='authentification')
+               .values_list('codename', flat=True)) >= {codename for codename, _ in PERMISSIONS}
+    for name, codenames in GROUP_PERMISSIONS.items():
+        assert group_codenames(name) == set(codenames)
+
+
+@pytest.mark.django_db
+def test_bootstrap_is_idempotent_and_cheap(django_assert_max_num_queries):
+    bootstrap_permissions()
+    count = Permission.objects.count()
+
+    # Type de contenu, permissions, groupes, puis une lecture par set() sans écriture
+    with django_assert_max_num_queries(2 + len(GROUP_PERMISSIONS) + 2):
+        bootstrap_permissions()
+    assert Permission.objects.count() == count
+
+
+@pytest.mark.django_db
+def test_bootstrap_repairs_groups_and_missing_permissions():
+    staff = Group.objects.get(name='staff')
+    staff.permissions.remove(Permission.objects.get(codename='can_export_data'))
+    Permission.objects.filter(codename='can_view_stats').delete()
+    Group.objects.filter(name='client').delete()
+    Permission.objects.filter(codename='can_add_media').update(name='Ancien nom')
+
+    bootstrap_permissions()
+
+    assert group_codenames('staff') == set(GROUP_PERMISSIONS['staff'])
+    assert group_codenames('client') == {'can_view_media'}
+    assert Permission.objects.get(codename='can_add_media').name == 'Can add media'
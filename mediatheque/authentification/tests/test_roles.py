@@ -0,0 +1,68 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from authentification.roles import get_access
+
+AUTH_TABLES = ('"auth_group"', '"auth_permission"', '"auth_group_permissions"')
+
+
+def auth_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if any(table in query['sql'] for table in AUTH_TABLES)]
+
+
+@pytest.fixture
+def staff_member(client):
+    # Membre du groupe staff sans être superutilisateur : ses droits viennent du groupe
+    user = get_user_model().objects.create_user(username='bibliothecaire', password='motdepasse', role='staff')
+    user.groups.add(Group.objects.get(name='staff'))
+    client.force_login(user)
+    return user
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['media_list', 'authentification:espace_staff'])
+def test_role_and_permissions_are_loaded_once_then_cached(client, staff_member, url_name):
+    with CaptureQueriesContext(connection) as first:
+        assert client.get(reverse(url_name)).status_code == 200
+    with CaptureQueriesContext(connection) as second:
+        assert client.get(reverse(url_name)).status_code == 200
+
+    assert 1 <= len(auth_queries(first)) <= 2
+    assert auth_queries(second) == []
+
+
+@pytest.mark.django_db
+def test_group_changes_invalidate_cached_access(client, staff_member, django_capture_on_commit_callbacks):
+    assert client.get(reverse('media_list')).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        staff_member.groups.clear()
+
+    assert client.get(reverse('media_list')).status_code == 403
+    assert client.get(reverse('authentification:espace_staff')).status_code == 302
+
+
+@pytest.mark.django_db
+def test_get_access_reads_role_groups_and_permissions(staff_member):
+    access = get_access(get_user_model().objects.get(pk=staff_member.pk))
+
+    assert access['role'] == 'staff'
+    assert access['groups'] == {'staff'}
+    assert 'authentification.can_borrow_media' in access['permissions']
+
+
+@pytest.mark.django_db
+def test_demoted_superuser_loses_cached_permissions(client):
+    user = get_user_model().objects.create_superuser(username='ancien', password='motdepasse')
+    assert 'authentification.can_export_data' in get_access(user)['permissions']
+
+    user.is_superuser = False
+    user.save()
+    client.force_login(user)
+
+    assert get_access(get_user_model().objects.get(pk=user.pk))['permissions'] == set()
+    assert client.get(reverse('export_media', args=['csv'])).status_code == 403
@@ -1,10 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.response import TemplateResponse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from .forms import CustomUserCreationForm, LoginForm, EditProfileForm
+from .roles import ain_group, in_group
+import asyncio
+import math
+from django.db.models import Min
 from django.utils import timezone
+from mediatheque.caching import acached, afragment_context
+from mediatheque.db_routers import read_from_replica
 from mediatheque.models import MediathequeBorrow, Media
+from mediatheque.pagination import apaginate, get_catalogue_filters
 from django.contrib.auth.models import User
 
 
@@ -71,7 +79,7 @@ def logout_view(request):
 @login_required
 def edit_profile(request, user_id):
     # Vérifier que l'utilisateur connecté est un staff
-    if not request.user.groups.filter(name="staff").exists():
+    if not in_group(request.user, 'staff'):
         messages.error(request, "Vous n'avez pas les permissions nécessaires pour modifier ce profil.")
         return redirect('authentification:home')
 
@@ -99,43 +107,80 @@ def edit_profile(request, user_id):
     return render(request, 'authentification/modifier_profil.html', {'form': form, 'client': client})
 
 
+async def _alist(queryset):
+    return [obj async for obj in queryset.aiterator()]
+
+
 # Décorateur pour vérifier que l'utilisateur est connecté
-# Vue du tableau de bord client
+# Vue du tableau de bord client (asynchrone : requêtes lancées ensemble avec asyncio.gather)
 @login_required
-def client_dashboard(request):
-    if not request.user.groups.filter(name='client').exists():
+@read_from_replica
+async def client_dashboard(request):
+    # Utilisateur chargé une fois ici : le rendu du gabarit (user.is_authenticated...) ne le relit pas
+    request.user = user = await request.auser()
+    if not await ain_group(user, 'client'):
         return redirect('authentification:home')  # Redirige si l'utilisateur n'appartient pas au groupe 'client'
 
-    # Récupérer les emprunts en cours pour l'utilisateur
-    borrows = MediathequeBorrow.objects.filter(user=request.user, is_returned=False).select_related('media')
-
-    # Récupérer les médias disponibles à l'emprunt
-    available_media = Media.objects.filter(can_borrow=True, available=True)
-
-    return render(request, "authentification/espace_client.html", {
+    # Les données viennent du cache tant que le catalogue et les emprunts n'ont pas changé (voir mediatheque/caching.py)
+    media_type, _ = get_catalogue_filters(request)
+    borrows, available_media = await asyncio.gather(
+        # Récupérer les emprunts en cours pour l'utilisateur
+        acached('client_borrows', [user.pk], lambda: _alist(
+            MediathequeBorrow.objects.filter(user=user, is_returned=False).select_related('media')
+        )),
+        # Récupérer les médias disponibles à l'emprunt, page par page
+        acached('available_media', [media_type, request.GET.get('cursor')], lambda: apaginate(
+            request,
+            Media.objects.filter_catalogue(media_type, available=True).filter(can_borrow=True).polymorphic(),
+            'name',
+        )),
+    )
+
+    return TemplateResponse(request, "authentification/client_dashboard.html", {
         'borrows': borrows,
         'available_media': available_media
     })
 
 
-# Vue du tableau de bord staff
-@login_required
-def staff_dashboard(request):
-    if not request.user.groups.filter(name="staff").exists():
-        return redirect("authentification:home")
-
-    # Récupérer tous les emprunts en cours (avec les médias associés pour éviter des requêtes supplémentaires)
-    borrows = MediathequeBorrow.objects.filter(is_returned=False).select_related('media')
+async def _seconds_until_next_due(now):
+    # Temps restant avant qu'un emprunt en cours ne passe en retard (None : aucun, durée par défaut)
+    next_due = (await MediathequeBorrow.objects.filter(is_returned=False, due_date__gte=now).aaggregate(
+        Min('due_date')))['due_date__min']
+    if next_due is None:
+        return None
+    return max(math.ceil((next_due - now).total_seconds()), 1)
 
-    # Récupérer les emprunts en retard
-    overdue_borrows = MediathequeBorrow.objects.filter(is_returned=False, due_date__lt=timezone.now()).select_related(
-        'media')
 
-    # Récupérer tous les médias (selon ton cas, tu peux envisager des filtres spécifiques pour le staff)
-    all_media = Media.objects.all()
+# Vue du tableau de bord staff (asynchrone : les trois listes sont chargées ensemble)
+@login_required
+@read_from_replica
+async def staff_dashboard(request):
+    request.user = user = await request.auser()
+    if not await ain_group(user, 'staff'):
+        return redirect("authentification:home")
 
-    return render(request, "authentification/espace_staff.html", {
+    now = timezone.now()
+    media_type, available = get_catalogue_filters(request)
+    borrows, overdue_borrows, all_media = await asyncio.gather(
+        # Récupérer les emprunts en cours page par page (avec les médias associés pour éviter des requêtes supplémentaires)
+        acached('active_borrows', [request.GET.get('borrows_cursor')], lambda: apaginate(
+            request, MediathequeBorrow.objects.filter(is_returned=False).select_related('media', 'user'), 'due_date',
+            cursor_param='borrows_cursor',
+        )),
+        # Récupérer les emprunts en retard ; l'entrée expire dès que le prochain emprunt arrive à échéance
+        acached('overdue_borrows', [], lambda: _alist(
+            MediathequeBorrow.objects.filter(is_returned=False, due_date__lt=now).select_related('media', 'user')
+        ), timeout=lambda: _seconds_until_next_due(now)),
+        # Récupérer les médias page par page, avec les filtres du catalogue
+        acached('all_media', [media_type, available, request.GET.get('media_cursor')], lambda: apaginate(
+            request, Media.objects.filter_catalogue(media_type, available).polymorphic(), 'name',
+            cursor_param='media_cursor',
+        )),
+    )
+
+    return TemplateResponse(request, "authentification/staff_dashboard.html", {
         'borrows': borrows,
         'overdue_borrows': overdue_borrows,
-        'all_media': all_media
+        'all_media': all_media,
+        **await afragment_context(),
     })
@@ -0,0 +1,166 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from mediatheque.caching import bump_version
+from mediatheque.models import Media, MediathequeBorrow, MAX_ACTIVE_BORROWS
+
+User = get_user_model()
+
+# Durée d'un emprunt
+BORROW_DURATION_DAYS = 7
+
+# Tables d'emprunts prises en compte par les compteurs des membres
+# (staff.StaffBorrow est un proxy : ses emprunts sont dans la même table)
+BORROW_MODELS = ['mediatheque.MediathequeBorrow']
+
+
+class BorrowError(Exception):
+    """Emprunt ou retour refusé ; le message est destiné à l'utilisateur."""
+
+
+def borrow_media(user, media_id, now=None):
+    """
+    Emprunte un média en une seule transaction.
+
+    Lève BorrowError si l'emprunt est refusé et Media.DoesNotExist si le média n'existe pas.
+
+    La disponibilité est basculée par un UPDATE conditionnel (... WHERE available),
+    puis le compteur d'emprunts du membre par un second UPDATE conditionnel
+    (... WHERE active_borrow_count < 3 AND late_borrow_count = 0) : deux emprunts
+    simultanés ne peuvent ni prêter deux fois le même média ni dépasser la limite,
+    et aucune lecture n'est nécessaire sur le chemin nominal.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        reserved = Media.objects.filter(pk=media_id, available=True, can_borrow=True).exclude(
+            media_type='board_game'
+        ).update(available=False)
+        if not reserved:
+            raise BorrowError(_unavailable_reason(media_id))
+
+        counted = User.objects.filter(
+            pk=user.pk, active_borrow_count__lt=MAX_ACTIVE_BORROWS, late_borrow_count=0
+        ).update(active_borrow_count=F('active_borrow_count') + 1)
+        if not counted:
+            # L'exception annule aussi la mise à jour de la disponibilité
+            raise BorrowError(
+                'Vous ne pouvez pas emprunter plus de 3 médias à la fois ou vous avez des emprunts en retard.'
+            )
+
+        return MediathequeBorrow.objects.create(
+            user=user,
+            media_id=media_id,
+            borrow_date=now,
+            due_date=now + timedelta(days=BORROW_DURATION_DAYS),
+        )
+
+
+def _unavailable_reason(media_id):
+    # Relu uniquement en cas d'échec, pour expliquer le refus
+    media = Media.objects.filter(pk=media_id).values('media_type', 'can_borrow').first()
+    if media is None:
+        raise Media.DoesNotExist(f"Media {media_id} does not exist.")
+    if media['media_type'] == 'board_game':
+        return 'Les jeux de plateau ne peuvent pas être empruntés.'
+    if not media['can_borrow']:
+        return "Ce média ne peut pas être emprunté."
+    return "Ce média est déjà emprunté."
+
+
+def return_borrow(borrow_id, now=None):
+    """
+    Clôt un emprunt et rend le média disponible, dans la même transaction.
+
+    Lève MediathequeBorrow.DoesNotExist si l'emprunt n'existe pas ou est déjà retourné.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        returned = MediathequeBorrow.objects.filter(pk=borrow_id, is_returned=False).update(
+            is_returned=True, return_date=now
+        )
+        if not returned:
+            raise MediathequeBorrow.DoesNotExist(f"No active borrow {borrow_id}.")
+
+        borrow = MediathequeBorrow.objects.select_related('media').get(pk=borrow_id)
+        Media.objects.filter(pk=borrow.media_id).update(available=True)
+        User.objects.filter(pk=borrow.user_id).update(
+            active_borrow_count=Greatest(F('active_borrow_count') - 1, 0),
+            late_borrow_count=Greatest(F('late_borrow_count') - int(borrow.is_late), 0),
+        )
+        # Les UPDATE ne déclenchent pas post_save : la version des données est incrémentée ici
+        bump_version()
+        borrow.media.available = True
+        return borrow
+
+
+def add_late_borrows(user_ids):
+    """
+    Incrémente le compteur de retards des membres, une fois par emprunt passé en retard.
+
+    `user_ids` contient un identifiant de membre par emprunt marqué : un seul UPDATE
+    est envoyé par valeur d'incrément (le plus souvent 1).
+    """
+    users_by_increment = defaultdict(list)
+    for user_id, increment in Counter(user_ids).items():
+        users_by_increment[increment].append(user_id)
+    for increment, users in users_by_increment.items():
+        User.objects.filter(pk__in=users).update(late_borrow_count=F('late_borrow_count') + increment)
+
+
+def release_deleted_borrow(sender, instance, using=None, **kwargs):
+    """
+    Récepteur post_delete des modèles d'emprunt : un emprunt en cours supprimé directement
+    ou en cascade (membre, média) ne compte plus dans les compteurs de son membre.
+
+    Les suppressions en SQL brut (archivage des emprunts rendus) ne passent pas par ici ;
+    après une suppression massive hors ORM, lancer reconcile_borrow_counters.
+    """
+    if instance.is_returned:
+        return
+    User.objects.using(using).filter(pk=instance.user_id).update(
+        active_borrow_count=Greatest(F('active_borrow_count') - 1, 0),
+        late_borrow_count=Greatest(F('late_borrow_count') - int(instance.is_late), 0),
+    )
+
+
+def count_member_borrows():
+    # Compteurs réels recalculés depuis les tables d'emprunts : {id membre: [en cours, en retard]}
+    counts = defaultdict(lambda: [0, 0])
+    for label in BORROW_MODELS:
+        rows = apps.get_model(label).objects.filter(is_returned=False).values('user').annotate(
+            active=Count('pk'), late=Count('pk', filter=Q(is_late=True))
+        ).order_by()
+        for row in rows:
+            counts[row['user']][0] += row['active']
+            counts[row['user']][1] += row['late']
+    return counts
+
+
+def reconcile_borrow_counters(fix=True, batch_size=500):
+    """
+    Compare les compteurs des membres aux tables d'emprunts et corrige les écarts.
+
+    Renvoie la liste des écarts : (id membre, compteurs stockés, compteurs réels).
+    """
+    counts = count_member_borrows()
+    drift = []
+    drifted_users = []
+    members = User.objects.values_list('pk', 'active_borrow_count', 'late_borrow_count')
+    for pk, active, late in members.iterator(chunk_size=batch_size):
+        expected = tuple(counts.get(pk, (0, 0)))
+        if (active, late) != expected:
+            drift.append((pk, (active, late), expected))
+            drifted_users.append(User(pk=pk, active_borrow_count=expected[0], late_borrow_count=expected[1]))
+
+    if fix and drifted_users:
+        with transaction.atomic():
+            User.objects.bulk_update(drifted_users, ['active_borrow_count', 'late_borrow_count'],
+                                     batch_size=batch_size)
+    return drift
@@ -0,0 +1,133 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+
+from mediatheque.models import Media
+
+DEFAULTS = {
+    # Alias de CACHES utilisé ; prendre un cache partagé (fichiers, redis...) dès qu'il y a plusieurs processus
+    'ALIAS': 'default',
+    # Durée de vie par défaut d'une entrée, en secondes
+    'TIMEOUT': 300,
+}
+
+VERSION_KEY = 'mediatheque:data_version'
+
+_MISSING = object()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'DATA_CACHE', {})}
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def _initial_version():
+    # Jamais une petite valeur fixe : une clé de version évincée puis recréée
+    # ne retombe pas sur des entrées écrites sous une ancienne version
+    return time.time_ns()
+
+
+# `key` : compteur de version ; VERSION_KEY pour les données, d'autres modules
+# (authentification.roles) tiennent le leur dans le même cache
+
+def current_version(key=VERSION_KEY):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        initial = _initial_version()
+        cache.add(key, initial, timeout=None)
+        version = cache.get(key, initial)
+    return version
+
+
+async def acurrent_version(key=VERSION_KEY):
+    cache = get_cache()
+    version = await cache.aget(key)
+    if version is None:
+        initial = _initial_version()
+        await cache.aadd(key, initial, timeout=None)
+        version = await cache.aget(key, initial)
+    return version
+
+
+def _increment_version(key=VERSION_KEY):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Clé absente (évincée ou cache vidé) : toute entrée existante devient inaccessible
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_version(using=None, key=VERSION_KEY):
+    """
+    Invalide toutes les entrées mises en cache par `cached`.
+
+    L'incrément a lieu après le commit (immédiatement hors transaction) : une lecture
+    concurrente ne peut pas remettre en cache l'état d'avant sous la nouvelle version,
+    et une transaction annulée n'invalide rien.
+    """
+    transaction.on_commit(lambda: _increment_version(key), using=using)
+
+
+def reset_version(key=VERSION_KEY, **kwargs):
+    # Récepteur post_migrate : après migrate ou flush, rien de ce qui est en cache ne correspond à la base
+    _increment_version(key)
+
+
+def _read_alias():
+    # Base lue par la vue en cours : une entrée calculée sur la réplique (en retard)
+    # n'est jamais servie à un membre épinglé sur la base principale
+    return router.db_for_read(Media)
+
+
+def _make_key(name, key_parts, version):
+    digest = hashlib.sha1(repr(key_parts).encode()).hexdigest()
+    return f'mediatheque:{name}:{_read_alias()}:{version}:{digest}'
+
+
+def cached(name, key_parts, compute, timeout=None):
+    """
+    Renvoie compute(), mis en cache sous (name, key_parts, version des données).
+
+    `timeout` peut être un appelable, évalué seulement en cas d'absence dans le cache
+    (utile quand la validité dépend de l'heure, comme les retards).
+    """
+    cache = get_cache()
+    key = _make_key(name, key_parts, current_version())
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        if callable(timeout):
+            timeout = timeout()
+        cache.set(key, value, get_config()['TIMEOUT'] if timeout is None else timeout)
+    return value
+
+
+async def acached(name, key_parts, compute, timeout=None):
+    # Version asynchrone de cached() : compute (et timeout s'il est appelable) sont des coroutines
+    cache = get_cache()
+    key = _make_key(name, key_parts, await acurrent_version())
+    value = await cache.aget(key, _MISSING)
+    if value is _MISSING:
+        value = await compute()
+        if callable(timeout):
+            timeout = await timeout()
+        await cache.aset(key, value, get_config()['TIMEOUT'] if timeout is None else timeout)
+    return value
+
+
+def fragment_context():
+    # Variables des balises {% cache %} des gabarits : un fragment mis en cache vit le temps d'une version
+    return {'data_version': f'{_read_alias()}:{current_version()}', 'fragment_cache_timeout': get_config()['TIMEOUT']}
+
+
+async def afragment_context():
+    return {'data_version': f'{_read_alias()}:{await acurrent_version()}',
+            'fragment_cache_timeout': get_config()['TIMEOUT']}
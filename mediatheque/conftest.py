@@ -0,0 +1,37 @@
+import os
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+
+
+def pytest_configure(config):
+    # Hachage MD5, hors de PASSWORD_PROFILES : les fixtures créent des comptes à chaque test
+    # et le PBKDF2 par défaut dominait la durée de la suite. MEDIATHEQUE_PASSWORD_PROFILE l'emporte.
+    if 'MEDIATHEQUE_PASSWORD_PROFILE' not in os.environ:
+        settings.PASSWORD_HASHERS = (['django.contrib.auth.hashers.MD5PasswordHasher']
+                                     + settings.PASSWORD_PROFILES['default'])
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Les caches mémoire survivent au rollback de la base entre deux tests
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def member():
+    # Membre sans droits particuliers (emprunts, compteurs, archivage)
+    return get_user_model().objects.create_user(username='member', password='password123')
+
+
+@pytest.fixture
+def staff_user():
+    # Superutilisateur du groupe staff : toutes les permissions et les vues réservées au staff
+    user = get_user_model().objects.create_superuser(username='staffuser', password='password123')
+    user.groups.add(Group.objects.get(name='staff'))
+    return user
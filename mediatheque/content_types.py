@@ -0,0 +1,32 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+# Cache du processus : label du modèle de média -> id de son ContentType
+_content_type_ids = {}
+
+
+def media_models():
+    # Modèles de média des deux applications (Media, ses sous-classes et leurs proxys staff)
+    return [model for model in apps.get_models() if hasattr(model, 'MEDIA_TYPES')]
+
+
+def warm_content_type_ids():
+    # Charge les ContentType de tous les modèles de média en une requête. Book, DVD... sont
+    # des proxys de Media : chacun garde son propre ContentType
+    content_types = ContentType.objects.get_for_models(*media_models(), for_concrete_models=False)
+    _content_type_ids.update(
+        (model._meta.label_lower, content_type.pk) for model, content_type in content_types.items()
+    )
+
+
+def clear_content_type_ids(**kwargs):
+    # Appelé après chaque migrate/flush : les ContentType peuvent avoir été recréés
+    _content_type_ids.clear()
+
+
+def content_type_id_for(model):
+    """Id du ContentType d'un modèle de média ; aucune requête une fois le cache chargé."""
+    label = model._meta.label_lower
+    if label not in _content_type_ids:
+        warm_content_type_ids()
+    return _content_type_ids[label]
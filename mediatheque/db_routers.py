@@ -0,0 +1,147 @@
+import contextvars
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+
+# Clé de session : jusqu'à quand (timestamp) les lectures du membre restent sur la base principale
+PIN_SESSION_KEY = '_primary_db_until'
+
+# Applications toujours lues sur la base principale (une session écrite à la connexion
+# doit être relue immédiatement, quel que soit le retard de la réplique)
+PRIMARY_ONLY_APPS = {'sessions'}
+
+# Vue en cours autorisée à lire sur la réplique (voir read_from_replica)
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+# État de la requête en cours : a-t-elle écrit ? (posé par ReplicaStickinessMiddleware)
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+class _RequestState:
+    __slots__ = ('wrote',)
+
+    def __init__(self):
+        self.wrote = False
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 30)
+
+
+class PrimaryReplicaRouter:
+    """
+    Écritures sur la base principale ; lectures sur la réplique uniquement dans les vues
+    décorées par read_from_replica, tant que la requête n'a rien écrit.
+
+    Les lectures faites dans une transaction de la base principale y restent : le code
+    qui lit puis écrit (services, commandes) voit toujours des données à jour.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if (state is not None and state.wrote) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplique est une copie de la base principale : mêmes données, mêmes clés
+        return True
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    return session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+async def ais_pinned(request):
+    session = getattr(request, 'session', None)
+    return session is not None and await session.aget(PIN_SESSION_KEY, 0) > time.time()
+
+
+def read_from_replica(view):
+    """Les lectures de la vue vont sur la réplique, sauf pour un membre qui vient d'écrire."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not replica_configured() or await ais_pinned(request):
+                return await view(request, *args, **kwargs)
+            # Le contexte est copié dans les threads de l'ORM asynchrone : le routeur le voit
+            token = _replica_reads.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_configured() or is_pinned(request):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Après une requête qui a écrit, épingle les lectures du membre sur la base principale
+    pendant REPLICA_STICKY_SECONDS (à régler au-dessus du retard de la réplique) : il
+    relit ce qu'il vient d'écrire.
+
+    Sans base 'replica' configurée, le middleware se retire de la chaîne au démarrage.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RequestState()
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            request.session[PIN_SESSION_KEY] = time.time() + get_sticky_seconds()
+        return response
+
+    async def __acall__(self, request):
+        # L'état est un objet partagé : les écritures faites dans les threads de l'ORM y sont visibles
+        state = _RequestState()
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            await request.session.aset(PIN_SESSION_KEY, time.time() + get_sticky_seconds())
+        return response
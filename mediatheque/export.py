@@ -0,0 +1,91 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from mediatheque.archive import borrow_history
+from mediatheque.models import Media
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (nom de colonne, chemin ORM) : les champs propres à chaque type sont dans la table des médias
+CATALOGUE_COLUMNS = [
+    ('id', 'id'),
+    ('name', 'name'),
+    ('media_type', 'media_type'),
+    ('available', 'available'),
+    ('can_borrow', 'can_borrow'),
+    ('author', 'author'),
+    ('producer', 'producer'),
+    ('artist', 'artist'),
+    ('creators', 'creators'),
+    ('game_type', 'game_type'),
+]
+
+BORROW_COLUMNS = [
+    ('id', 'id'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('media_id', 'media_id'),
+    ('media_name', 'media__name'),
+    ('media_type', 'media__media_type'),
+    ('borrow_date', 'borrow_date'),
+    ('due_date', 'due_date'),
+    ('return_date', 'return_date'),
+    ('is_returned', 'is_returned'),
+    ('is_late', 'is_late'),
+]
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def catalogue_rows(media_type=None):
+    # Tuples lus par paquets : aucune instance de modèle, mémoire constante
+    queryset = Media.objects.all()
+    if media_type:
+        queryset = queryset.filter(media_type=media_type)
+    return queryset.order_by('id').values_list(
+        *[path for _, path in CATALOGUE_COLUMNS]
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def borrow_rows(media_type=None, date_from=None, date_to=None):
+    # Filtre sur la date d'emprunt, bornes incluses ; emprunts archivés compris
+    lookups = {}
+    if media_type:
+        lookups['media__media_type'] = media_type
+    if date_from:
+        lookups['borrow_date__gte'] = _day_start(date_from)
+    if date_to:
+        lookups['borrow_date__lt'] = _day_start(date_to + timedelta(days=1))
+    return borrow_history(*[path for _, path in BORROW_COLUMNS], **lookups).order_by('id').iterator(
+        chunk_size=EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    # Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in columns])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(columns, rows):
+    names = [name for name, _ in columns]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+STREAMERS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
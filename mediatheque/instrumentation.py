@@ -0,0 +1,175 @@
+import contextvars
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import deque
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+DEFAULTS = {
+    'ENABLED': False,
+    # Nombre de mesures conservées par vue (les plus anciennes sont écrasées)
+    'BUFFER_SIZE': 1000,
+    # Fichier JSON où le résumé est écrit toutes les SNAPSHOT_EVERY requêtes (lu par manage.py request_stats)
+    'SNAPSHOT_PATH': None,
+    'SNAPSHOT_EVERY': 500,
+}
+
+METRICS = ('queries', 'db_ms', 'template_ms', 'wall_ms')
+PERCENTILES = (50, 95, 99)
+
+_current_sample = contextvars.ContextVar('request_stats_sample', default=None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_STATS', {})}
+
+
+class _Sample:
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+def percentile(sorted_values, p):
+    # Rang le plus proche : pas d'interpolation, valeur réellement observée
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class RequestStats:
+    """Tampon circulaire de mesures par nom de vue, agrégé en percentiles à la demande."""
+
+    def __init__(self, buffer_size):
+        self.buffer_size = buffer_size
+        self.total = 0
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, queries, db_ms, template_ms, wall_ms):
+        with self._lock:
+            buffer = self._samples.get(view_name)
+            if buffer is None:
+                buffer = self._samples[view_name] = deque(maxlen=self.buffer_size)
+            buffer.append((queries, db_ms, template_ms, wall_ms))
+            self.total += 1
+            return self.total
+
+    def summary(self):
+        with self._lock:
+            samples = {name: list(buffer) for name, buffer in self._samples.items()}
+        result = {}
+        for name, rows in samples.items():
+            view = {'count': len(rows)}
+            for metric, values in zip(METRICS, zip(*rows)):
+                values = sorted(values)
+                view[metric] = {f'p{p}': round(percentile(values, p), 3) for p in PERCENTILES}
+                view[metric]['max'] = round(values[-1], 3)
+            result[name] = view
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.total = 0
+
+
+request_stats = RequestStats(DEFAULTS['BUFFER_SIZE'])
+
+
+def write_snapshot(path):
+    # Écriture atomique : le fichier est toujours complet pour le lecteur
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, suffix='.tmp') as tmp:
+        json.dump(request_stats.summary(), tmp)
+    os.replace(tmp.name, path)
+
+
+def _count_query(execute, sql, params, many, context):
+    sample = _current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.db_time += perf_counter() - started
+
+
+_template_timing_installed = False
+
+
+def _install_template_timing():
+    # Mesure le rendu des gabarits Django (render(), TemplateResponse) ; installé une seule fois
+    global _template_timing_installed
+    if _template_timing_installed:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        sample = _current_sample.get()
+        if sample is None:
+            return original_render(self, context, request)
+        started = perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            sample.template_time += perf_counter() - started
+
+    Template.render = timed_render
+    _template_timing_installed = True
+
+
+class RequestStatsMiddleware:
+    """
+    Mesure, pour chaque vue (nom d'URL résolu), le nombre de requêtes SQL, le temps
+    passé en base, le temps de rendu des gabarits et le temps total.
+
+    Désactivé (REQUEST_STATS['ENABLED'] = False), le middleware se retire de la chaîne
+    au démarrage : aucun coût par requête.
+    """
+
+    def __init__(self, get_response):
+        config = get_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.snapshot_path = config['SNAPSHOT_PATH']
+        self.snapshot_every = config['SNAPSHOT_EVERY']
+        if request_stats.buffer_size != config['BUFFER_SIZE']:
+            request_stats.buffer_size = config['BUFFER_SIZE']
+            request_stats.reset()
+        _install_template_timing()
+
+    def __call__(self, request):
+        sample = _Sample()
+        token = _current_sample.set(sample)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_count_query))
+                response = self.get_response(request)
+        finally:
+            _current_sample.reset(token)
+
+        wall_time = perf_counter() - started
+        match = request.resolver_match
+        view_name = match.view_name if match else '<non résolue>'
+        total = request_stats.record(view_name, sample.queries, sample.db_time * 1000,
+                                     sample.template_time * 1000, wall_time * 1000)
+        if self.snapshot_path and total % self.snapshot_every == 0:
+            write_snapshot(self.snapshot_path)
+        return response
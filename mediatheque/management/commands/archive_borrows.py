@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mediatheque.archive import DEFAULT_ARCHIVE_AFTER_DAYS, DEFAULT_CHUNK_SIZE, archive_returned_borrows
+
+
+class Command(BaseCommand):
+    help = "Déplace par lots les emprunts rendus depuis longtemps vers la table d'archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS,
+                            help="Ancienneté minimale du retour, en jours")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Nombre d'emprunts déplacés par transaction")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['older_than_days'])
+        count = archive_returned_borrows(before=before, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} emprunt(s) archivé(s)."))
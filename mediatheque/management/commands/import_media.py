@@ -0,0 +1,51 @@
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mediatheque.importer import DEFAULT_CHUNK_SIZE, import_media
+
+FORMATS_BY_SUFFIX = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+class Command(BaseCommand):
+    help = "Importe des médias (book, dvd, cd, board_game) depuis un fichier CSV ou JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer, ou « - » pour l'entrée standard")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="Format du fichier (déduit de l'extension par défaut)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Nombre de lignes validées et écrites par transaction")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or FORMATS_BY_SUFFIX.get(Path(path).suffix.lower())
+        if file_format is None:
+            raise CommandError("Impossible de déduire le format : utilisez --format csv ou --format jsonl.")
+
+        started = time.monotonic()
+
+        def progress(imported, errors):
+            rate = imported / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f"{imported} médias importés, {len(errors)} ligne(s) rejetée(s) ({rate:.0f}/s)")
+
+        if path == '-':
+            imported, errors = import_media(sys.stdin, file_format, options['chunk_size'], progress)
+        else:
+            try:
+                with open(path, newline='', encoding='utf-8') as stream:
+                    imported, errors = import_media(stream, file_format, options['chunk_size'], progress)
+            except OSError as error:
+                raise CommandError(f"Lecture impossible de {path} : {error}")
+
+        for error in errors:
+            self.stderr.write(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Import terminé : {imported} médias en {time.monotonic() - started:.1f} s, {len(errors)} rejet(s)."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from mediatheque.overdue import DEFAULT_CHUNK_SIZE, mark_all_overdue_borrows
+
+
+class Command(BaseCommand):
+    help = "Marque en retard (is_late) les emprunts non rendus dont l'échéance est dépassée"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Nombre d'emprunts mis à jour par requête UPDATE")
+        parser.add_argument('--full', action='store_true',
+                            help="Ignore le repère du dernier passage et parcourt tous les emprunts")
+
+    def handle(self, *args, **options):
+        results = mark_all_overdue_borrows(chunk_size=options['chunk_size'], full=options['full'])
+        for label, count in results.items():
+            self.stdout.write(f"{label} : {count} emprunt(s) marqué(s) en retard.")
+        self.stdout.write(self.style.SUCCESS("Terminé."))
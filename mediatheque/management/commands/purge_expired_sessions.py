@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from mediatheque.sessions import DEFAULT_CHUNK_SIZE, purge_expired_sessions, session_table_used
+
+
+class Command(BaseCommand):
+    help = "Supprime par lots les sessions expirées (moteurs de session 'db' et 'cached_db')"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Nombre de sessions supprimées par requête DELETE")
+
+    def handle(self, *args, **options):
+        if not session_table_used():
+            self.stdout.write("Sessions hors de la base : rien à purger.")
+            return
+        count = purge_expired_sessions(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} session(s) expirée(s) supprimée(s)."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from mediatheque.borrowing import reconcile_borrow_counters
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs d'emprunts des membres depuis les tables d'emprunts et signale les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Signale les écarts sans corriger les compteurs")
+
+    def handle(self, *args, **options):
+        drift = reconcile_borrow_counters(fix=not options['dry_run'])
+        for user_id, stored, expected in drift:
+            self.stdout.write(
+                f"Membre {user_id} : en cours {stored[0]} -> {expected[0]}, en retard {stored[1]} -> {expected[1]}"
+            )
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Aucun écart."))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} membre(s) en écart (non corrigés)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(drift)} membre(s) corrigé(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mediatheque.db_routers import REPLICA_ALIAS, replica_configured
+from mediatheque.sqlite import refresh_replica
+
+
+class Command(BaseCommand):
+    help = "Recopie la base principale dans la réplique en lecture (API de sauvegarde SQLite)"
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError(f"Aucune base '{REPLICA_ALIAS}' configurée (MEDIATHEQUE_REPLICA_DB).")
+        refresh_replica(REPLICA_ALIAS)
+        self.stdout.write(self.style.SUCCESS("Réplique mise à jour."))
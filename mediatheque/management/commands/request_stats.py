@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mediatheque.instrumentation import get_config
+
+
+class Command(BaseCommand):
+    help = ("Affiche les mesures par vue écrites par RequestStatsMiddleware "
+            "(fichier REQUEST_STATS['SNAPSHOT_PATH'])")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Fichier de mesures (par défaut REQUEST_STATS['SNAPSHOT_PATH'])")
+        parser.add_argument('--json', action='store_true', help="Affiche le JSON brut")
+
+    def handle(self, *args, **options):
+        path = options['path'] or get_config()['SNAPSHOT_PATH']
+        if not path:
+            raise CommandError("Aucun fichier de mesures : définissez REQUEST_STATS['SNAPSHOT_PATH'] ou --path.")
+        try:
+            with open(path, encoding='utf-8') as snapshot:
+                views = json.load(snapshot)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Lecture impossible de {path} : {error}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(views, indent=2))
+            return
+
+        self.stdout.write(f"{'vue':40} {'n':>6} {'req p50':>8} {'req p95':>8} {'db p95':>9} "
+                          f"{'tpl p95':>9} {'total p50':>10} {'total p95':>10} {'total p99':>10}")
+        # Les vues les plus lentes (p95) en premier
+        for name, view in sorted(views.items(), key=lambda item: -item[1]['wall_ms']['p95']):
+            self.stdout.write(
+                f"{name:40} {view['count']:>6} {view['queries']['p50']:>8g} {view['queries']['p95']:>8g} "
+                f"{view['db_ms']['p95']:>7.1f}ms {view['template_ms']['p95']:>7.1f}ms "
+                f"{view['wall_ms']['p50']:>8.1f}ms {view['wall_ms']['p95']:>8.1f}ms {view['wall_ms']['p99']:>8.1f}ms"
+            )
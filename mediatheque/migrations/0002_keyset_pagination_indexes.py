@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('mediatheque', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['name', 'id'], name='mediatheque_name_497336_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediathequeborrow',
+            index=models.Index(fields=['due_date', 'id'], name='mediatheque_due_dat_4a24ca_idx'),
+        ),
+    ]
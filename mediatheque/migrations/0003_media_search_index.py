@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediatheque', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        # Index plein texte SQLite FTS5 : rowid = id du média
+        migrations.RunSQL(
+            sql=(
+                "CREATE VIRTUAL TABLE mediatheque_media_fts USING fts5("
+                "name, creators, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ),
+            reverse_sql='DROP TABLE mediatheque_media_fts',
+        ),
+        # Indexation des médias déjà présents
+        migrations.RunSQL(
+            sql=(
+                "INSERT INTO mediatheque_media_fts (rowid, name, creators) "
+                "SELECT m.id, m.name, COALESCE(b.author, d.producer, c.artist, g.creators, '') "
+                "FROM mediatheque_media m "
+                "LEFT JOIN mediatheque_book b ON b.media_ptr_id = m.id "
+                "LEFT JOIN mediatheque_dvd d ON d.media_ptr_id = m.id "
+                "LEFT JOIN mediatheque_cd c ON c.media_ptr_id = m.id "
+                "LEFT JOIN mediatheque_boardgame g ON g.media_ptr_id = m.id"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
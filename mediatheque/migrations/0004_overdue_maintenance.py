@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediatheque', '0003_media_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='mediathequeborrow',
+            index=models.Index(fields=['is_returned', 'due_date'], name='mediatheque_is_retu_85e556_idx'),
+        ),
+    ]
@@ -0,0 +1,158 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+# Colonnes recopiées de chaque table fille vers mediatheque_media
+CHILD_TABLES = [
+    ('book', 'Book', ['author']),
+    ('dvd', 'DVD', ['producer']),
+    ('cd', 'CD', ['artist']),
+    ('board_game', 'BoardGame', ['creators', 'is_visible', 'is_available', 'game_type']),
+]
+# Les colonnes filles sont d'abord renommées : Media ne peut pas déclarer un champ
+# qu'une sous-classe concrète déclare aussi
+OLD_PREFIX = 'old_'
+
+
+def _rename_child_fields():
+    return [
+        migrations.RenameField(model_name=model.lower(), old_name=column, new_name=OLD_PREFIX + column)
+        for _, model, columns in CHILD_TABLES for column in columns
+    ]
+
+
+def _copy_to_media_sql():
+    statements = []
+    for _, model, columns in CHILD_TABLES:
+        table = f'mediatheque_{model.lower()}'
+        names = ', '.join(columns)
+        old_names = ', '.join(OLD_PREFIX + column for column in columns)
+        statements.append(
+            f"UPDATE mediatheque_media SET ({names}) = "
+            f"(SELECT {old_names} FROM {table} WHERE media_ptr_id = mediatheque_media.id) "
+            f"WHERE id IN (SELECT media_ptr_id FROM {table})"
+        )
+    return statements
+
+
+def _copy_to_children_sql():
+    # Retour arrière : une ligne fille par média de son type dont l'attribut obligatoire est rempli
+    statements = []
+    for media_type, model, columns in CHILD_TABLES:
+        names = ', '.join(columns)
+        old_names = ', '.join(OLD_PREFIX + column for column in columns)
+        statements.append(
+            f"INSERT INTO mediatheque_{model.lower()} (media_ptr_id, {old_names}) "
+            f"SELECT id, {names} FROM mediatheque_media "
+            f"WHERE media_type = '{media_type}' AND {columns[0]} IS NOT NULL"
+        )
+    return statements
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediatheque', '0004_overdue_maintenance'),
+        ('staff', '0003_merge_into_mediatheque'),
+    ]
+
+    operations = _rename_child_fields() + [
+        migrations.AddField(
+            model_name='media',
+            name='artist',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='author',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='creators',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='game_type',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='is_available',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='is_visible',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='producer',
+            field=models.CharField(max_length=200, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(fields=['media_type', 'name', 'id'], name='mediatheque_media_t_63fff4_idx'),
+        ),
+        # Les attributs des tables filles passent dans mediatheque_media (mêmes ids : emprunts
+        # et index plein texte restent valables). Retour arrière : après recréation des tables filles
+        migrations.RunSQL(sql=_copy_to_media_sql(), reverse_sql=_copy_to_children_sql()),
+        migrations.DeleteModel(
+            name='BoardGame',
+        ),
+        migrations.DeleteModel(
+            name='Book',
+        ),
+        migrations.DeleteModel(
+            name='CD',
+        ),
+        migrations.DeleteModel(
+            name='DVD',
+        ),
+        migrations.CreateModel(
+            name='BoardGame',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.media',),
+        ),
+        migrations.CreateModel(
+            name='Book',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.media',),
+        ),
+        migrations.CreateModel(
+            name='CD',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.media',),
+        ),
+        migrations.CreateModel(
+            name='DVD',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.media',),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediatheque', '0005_single_table_media'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBorrow',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('borrow_date', models.DateTimeField()),
+                ('return_date', models.DateTimeField(blank=True, null=True)),
+                ('is_returned', models.BooleanField(default=True)),
+                ('due_date', models.DateTimeField()),
+                ('is_late', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('media', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_borrow_set', to='mediatheque.media')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_borrow_set', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'borrow_date'], name='mediatheque_user_id_76719e_idx'), models.Index(fields=['borrow_date'], name='mediatheque_borrow__2a676b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('mediatheque', '0006_borrow_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mediathequeborrow',
+            name='mediatheque_user_id_f1380b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mediathequeborrow',
+            name='mediatheque_due_dat_4a24ca_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mediathequeborrow',
+            name='mediatheque_is_retu_85e556_idx',
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('available', True), ('can_borrow', True)), fields=['name', 'id'], name='media_borrowable_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('available', True), ('can_borrow', True)), fields=['media_type', 'name', 'id'], name='media_borrowable_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediathequeborrow',
+            index=models.Index(condition=models.Q(('is_returned', False)), fields=['user'], name='borrow_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediathequeborrow',
+            index=models.Index(condition=models.Q(('is_returned', False)), fields=['due_date', 'id'], name='borrow_active_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediathequeborrow',
+            index=models.Index(condition=models.Q(('is_returned', False)), fields=['media'], name='borrow_active_media_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db import models
-from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.contenttypes.models import ContentType
+from mediatheque.content_types import content_type_id_for
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
@@ -9,8 +9,49 @@ from django.db import transaction
 # Obtenez l'utilisateur personnalisé (si vous avez un modèle personnalisé)
 User = get_user_model()
 
+# Nombre maximal d'emprunts en cours par membre
+MAX_ACTIVE_BORROWS = 3
 
-# Modèle de base pour Media
+
+# Itération polymorphe : chaque ligne devient une instance du modèle de son type
+class PolymorphicModelIterable(models.query.ModelIterable):
+    def __iter__(self):
+        for media in super().__iter__():
+            # Book, DVD... sont des proxys de Media (mêmes colonnes) : aucune requête de plus
+            media.__class__ = MEDIA_MODELS.get(media.media_type, media.__class__)
+            yield media
+
+
+# QuerySet du catalogue : regroupe les requêtes utilisées par les listes de médias
+class MediaQuerySet(models.QuerySet):
+    def polymorphic(self):
+        """Renvoie des Book, DVD, CD et BoardGame selon media_type, dans l'ordre, en une requête."""
+        clone = self._chain()
+        clone._iterable_class = PolymorphicModelIterable
+        return clone
+
+    def with_active_borrow(self):
+        # Précharge l'emprunt en cours (et l'emprunteur) de chaque média en une seule requête,
+        # au lieu d'une requête par média dans la boucle d'affichage
+        return self.prefetch_related(
+            models.Prefetch(
+                'mediathequeborrow_set',
+                queryset=MediathequeBorrow.objects.filter(is_returned=False).select_related('user'),
+                to_attr='active_borrows',
+            )
+        )
+
+    def filter_catalogue(self, media_type=None, available=None):
+        queryset = self
+        if media_type:
+            queryset = queryset.filter(media_type=media_type)
+        if available is not None:
+            queryset = queryset.filter(available=available)
+        return queryset
+
+
+# Modèle de base pour Media : une seule table pour tous les types. media_type sert de
+# discriminant, les attributs propres à chaque type sont des colonnes NULL pour les autres
 class Media(models.Model):
     MEDIA_TYPES = [
         ('book', 'Book'),
@@ -18,68 +59,132 @@ class Media(models.Model):
         ('cd', 'CD'),
         ('board_game', 'Board Game'),
     ]
+    # Libellés calculés une fois pour la classe (appelé pour chaque ligne des listes)
+    MEDIA_TYPE_LABELS = dict(MEDIA_TYPES)
+    # Colonnes propres au type (redéfini par chaque sous-classe)
+    TYPE_FIELDS = []
 
     name = models.CharField(max_length=200)
     available = models.BooleanField(default=True)
     media_type = models.CharField(max_length=50, choices=MEDIA_TYPES)
-    borrows = GenericRelation('MediathequeBorrow', related_query_name='media')
     can_borrow = models.BooleanField(default=True)
 
+    # NULL hors de leur type ; blank=False : obligatoires dans les formulaires et l'import du type
+    author = models.CharField(max_length=200, null=True)
+    producer = models.CharField(max_length=200, null=True)
+    artist = models.CharField(max_length=200, null=True)
+    creators = models.CharField(max_length=100, null=True)
+    is_visible = models.BooleanField(default=True)
+    is_available = models.BooleanField(default=True)
+    game_type = models.CharField(max_length=100, blank=True, null=True)
+
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='mediatheque_media_set')
 
     object_id = models.PositiveIntegerField(null=True)
 
-    objects = models.Manager()
+    objects = MediaQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Clé de pagination des listes du catalogue
+            models.Index(fields=['name', 'id']),
+            # Listes d'un seul type (Book.objects..., filtre du catalogue), dans l'ordre de pagination
+            models.Index(fields=['media_type', 'name', 'id']),
+            # Index partiels des médias empruntables (tableau de bord client), tous types puis par type
+            models.Index(fields=['name', 'id'], condition=models.Q(available=True, can_borrow=True),
+                         name='media_borrowable_name_idx'),
+            models.Index(fields=['media_type', 'name', 'id'], condition=models.Q(available=True, can_borrow=True),
+                         name='media_borrowable_type_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_media_type_display()})"
 
     def get_media_type_display(self):
-        return dict(self.MEDIA_TYPES).get(self.media_type, self.media_type)
+        return self.MEDIA_TYPE_LABELS.get(self.media_type, self.media_type)
+
+    def save(self, *args, **kwargs):
+        if not self.content_type_id:
+            self.content_type_id = content_type_id_for(self._meta.concrete_model)
+        super().save(*args, **kwargs)
+
+    @property
+    def active_borrow(self):
+        # Utilise le préchargement de with_active_borrow() s'il a été fait
+        if hasattr(self, 'active_borrows'):
+            return self.active_borrows[0] if self.active_borrows else None
+        return self.mediathequeborrow_set.filter(is_returned=False).select_related('user').first()
+
+
+# Manager des sous-classes : uniquement les lignes de leur type
+class MediaTypeManager(models.Manager.from_queryset(MediaQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().filter(media_type=self.model.MEDIA_TYPE)
 
 
-# Modèle Livre (hérite de Media)
+# Modèle Livre (proxy de Media)
 class Book(Media):
-    author = models.CharField(max_length=200)
+    MEDIA_TYPE = 'book'
+    TYPE_FIELDS = ['author']
+
+    objects = MediaTypeManager()
+
+    class Meta:
+        proxy = True
 
     def save(self, *args, **kwargs):
         if not self.media_type:
             self.media_type = 'book'
-        if not self.content_type:
-            self.content_type = ContentType.objects.get_for_model(Book)
+        if not self.content_type_id:
+            self.content_type_id = content_type_id_for(Book)
         super().save(*args, **kwargs)
 
 
-# Modèle DVD (hérite de Media)
+# Modèle DVD (proxy de Media)
 class DVD(Media):
-    producer = models.CharField(max_length=200)
+    MEDIA_TYPE = 'dvd'
+    TYPE_FIELDS = ['producer']
+
+    objects = MediaTypeManager()
+
+    class Meta:
+        proxy = True
 
     def save(self, *args, **kwargs):
         if not self.media_type:
             self.media_type = 'dvd'
-        if not self.content_type:
-            self.content_type = ContentType.objects.get_for_model(DVD)
+        if not self.content_type_id:
+            self.content_type_id = content_type_id_for(DVD)
         super().save(*args, **kwargs)
 
 
-# Modèle CD (hérite de Media)
+# Modèle CD (proxy de Media)
 class CD(Media):
-    artist = models.CharField(max_length=200)
+    MEDIA_TYPE = 'cd'
+    TYPE_FIELDS = ['artist']
+
+    objects = MediaTypeManager()
+
+    class Meta:
+        proxy = True
 
     def save(self, *args, **kwargs):
         if not self.media_type:
             self.media_type = 'cd'
-        if not self.content_type:
-            self.content_type = ContentType.objects.get_for_model(CD)
+        if not self.content_type_id:
+            self.content_type_id = content_type_id_for(CD)
         super().save(*args, **kwargs)
 
 
-# Modèle Jeu de Plateau (hérite de Media)
+# Modèle Jeu de Plateau (proxy de Media)
 class BoardGame(Media):
-    creators = models.CharField(max_length=100)
-    is_visible = models.BooleanField(default=True)
-    is_available = models.BooleanField(default=True)
-    game_type = models.CharField(max_length=100, blank=True, null=True)
+    MEDIA_TYPE = 'board_game'
+    TYPE_FIELDS = ['creators', 'is_visible', 'is_available', 'game_type']
+
+    objects = MediaTypeManager()
+
+    class Meta:
+        proxy = True
 
     def __str__(self):
         return self.name
@@ -97,11 +202,15 @@ class BoardGame(Media):
     def save(self, *args, **kwargs):
         if not self.media_type:
             self.media_type = 'board_game'
-        if not self.content_type:
-            self.content_type = ContentType.objects.get_for_model(BoardGame)
+        if not self.content_type_id:
+            self.content_type_id = content_type_id_for(BoardGame)
         super().save(*args, **kwargs)
 
 
+# Modèle de chaque valeur de media_type
+MEDIA_MODELS = {model.MEDIA_TYPE: model for model in (Book, DVD, CD, BoardGame)}
+
+
 # Modèle Borrow (Emprunt)
 class MediathequeBorrow(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mediatheque_borrow_set')
@@ -113,8 +222,17 @@ class MediathequeBorrow(models.Model):
     is_late = models.BooleanField(default=False)
 
     class Meta:
+        # Index partiels limités aux emprunts en cours : l'historique des emprunts rendus n'y
+        # entre pas, leur taille suit le nombre de prêts en cours et non l'ancienneté de la base
         indexes = [
-            models.Index(fields=['user', 'is_returned']),
+            # Emprunts en cours d'un membre (tableau de bord client, recalcul des compteurs)
+            models.Index(fields=['user'], condition=models.Q(is_returned=False), name='borrow_active_user_idx'),
+            # Clé de pagination des emprunts en cours ; retards (tableau de bord staff,
+            # tâche mark_overdue_borrows) et prochaine échéance
+            models.Index(fields=['due_date', 'id'], condition=models.Q(is_returned=False),
+                         name='borrow_active_due_idx'),
+            # Emprunt en cours d'un média (disponibilité, emprunteur affiché dans les listes)
+            models.Index(fields=['media'], condition=models.Q(is_returned=False), name='borrow_active_media_idx'),
         ]
 
     def get_due_date(self):
@@ -130,8 +248,45 @@ class MediathequeBorrow(models.Model):
 
     @staticmethod
     def can_borrow(user):
-        if MediathequeBorrow.objects.filter(user=user, is_returned=False).count() >= 3:
-            return False
-        if MediathequeBorrow.objects.filter(user=user, is_late=True).exists():
-            return False
-        return True
+        return member_can_borrow(user)
+
+
+# Emprunts rendus archivés (voir mediatheque/archive.py) : mêmes colonnes et mêmes ids que
+# MediathequeBorrow, hors de la table des emprunts en cours et de ses index
+class ArchivedBorrow(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # Index (user, borrow_date) ci-dessous : pas d'index séparé sur user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_borrow_set', db_index=False)
+    media = models.ForeignKey(Media, on_delete=models.CASCADE, related_name='archived_borrow_set')
+    borrow_date = models.DateTimeField()
+    return_date = models.DateTimeField(null=True, blank=True)
+    is_returned = models.BooleanField(default=True)
+    due_date = models.DateTimeField()
+    is_late = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Historique d'un membre, du plus récent au plus ancien
+            models.Index(fields=['user', 'borrow_date']),
+            # Export filtré par période d'emprunt
+            models.Index(fields=['borrow_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} emprunté {self.media.name}"
+
+
+def member_can_borrow(user):
+    # Lecture des compteurs du membre par clé primaire, sans parcourir les emprunts
+    active, late = User.objects.filter(pk=user.pk).values_list('active_borrow_count', 'late_borrow_count').get()
+    return active < MAX_ACTIVE_BORROWS and not late
+
+
+# Repère d'avancement (high-water mark) des tâches de maintenance incrémentales
+class MaintenanceMark(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} : {self.value}"
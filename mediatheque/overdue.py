@@ -0,0 +1,70 @@
+from django.apps import apps
+from django.db import connection, transaction
+from django.utils import timezone
+
+from mediatheque.borrowing import BORROW_MODELS, add_late_borrows
+from mediatheque.caching import bump_version
+from mediatheque.models import MaintenanceMark
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _mark_late(model, ids):
+    """
+    Marque en retard les emprunts `ids` encore en cours et pas déjà en retard.
+
+    Un emprunt rendu entre la lecture du lot et cet UPDATE n'est pas touché ; les membres
+    à incrémenter viennent des lignes réellement modifiées (RETURNING).
+    """
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} = %s WHERE {} IN ({}) AND {} = %s AND {} = %s RETURNING {}'.format(
+        quote(model._meta.db_table), quote('is_late'), quote('id'), ', '.join(['%s'] * len(ids)),
+        quote('is_returned'), quote('is_late'), quote('user_id'),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [True, *ids, False, False])
+        return [user_id for user_id, in cursor.fetchall()]
+
+
+def mark_overdue_borrows(model, now=None, chunk_size=DEFAULT_CHUNK_SIZE, full=False):
+    """
+    Passe is_late à True pour les emprunts non rendus dont l'échéance est dépassée.
+
+    Seuls les emprunts arrivés à échéance depuis le dernier passage sont lus (repère
+    sur due_date), sauf avec full=True. Chaque lot est mis à jour par un seul UPDATE
+    dans sa propre transaction, avec les compteurs de retards des membres.
+    Renvoie le nombre d'emprunts marqués en retard.
+    """
+    now = now or timezone.now()
+    mark_name = f'overdue:{model._meta.label_lower}'
+    mark = None if full else MaintenanceMark.objects.filter(name=mark_name).values_list('value', flat=True).first()
+
+    # Parcours de l'index partiel borrow_active_due_idx (due_date, id des emprunts non rendus)
+    # sur la plage ]repère, maintenant]
+    pending = model.objects.filter(is_returned=False, is_late=False, due_date__lt=now)
+    if mark is not None:
+        pending = pending.filter(due_date__gte=mark)
+    pending = pending.order_by('due_date', 'pk')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(pending.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            user_ids = _mark_late(model, ids)
+            total += len(user_ids)
+            add_late_borrows(user_ids)
+            bump_version()
+
+    MaintenanceMark.objects.update_or_create(name=mark_name, defaults={'value': now})
+    return total
+
+
+def mark_all_overdue_borrows(now=None, chunk_size=DEFAULT_CHUNK_SIZE, full=False):
+    # Point d'entrée pour un planificateur (cron, celery beat...) : {label du modèle: nombre marqué}
+    now = now or timezone.now()
+    return {
+        label: mark_overdue_borrows(apps.get_model(label), now=now, chunk_size=chunk_size, full=full)
+        for label in BORROW_MODELS
+    }
@@ -0,0 +1,130 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Pagination par clé (keyset) sur le couple indexé (sort_field, pk).
+
+    Au lieu d'un OFFSET, chaque page reprend après la dernière clé vue : le coût
+    d'une page ne dépend pas de sa position dans la liste. Les curseurs sont opaques
+    (JSON encodé en base64) et indiquent le sens de lecture.
+    """
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, sort_field, per_page=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.sort_field = sort_field
+        self.per_page = per_page
+        self.field = queryset.model._meta.get_field(sort_field)
+
+    def encode_cursor(self, obj, direction):
+        key = [direction, self.field.value_to_string(obj), obj.pk]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        # Un curseur invalide ou modifié renvoie simplement à la première page
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in (self.NEXT, self.PREVIOUS):
+                return None
+            return direction, self.field.to_python(value), int(pk)
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            return None
+
+    def _page_queryset(self, cursor):
+        key = self.decode_cursor(cursor) if cursor else None
+        queryset = self.queryset
+
+        if key is None:
+            direction = self.NEXT
+        else:
+            direction, value, pk = key
+            if direction == self.NEXT:
+                queryset = queryset.filter(
+                    Q(**{f'{self.sort_field}__gt': value}) | Q(**{self.sort_field: value, 'pk__gt': pk})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{self.sort_field}__lt': value}) | Q(**{self.sort_field: value, 'pk__lt': pk})
+                )
+
+        if direction == self.NEXT:
+            queryset = queryset.order_by(self.sort_field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{self.sort_field}', '-pk')
+
+        # Une ligne de plus que la page permet de savoir s'il en reste après
+        return queryset[:self.per_page + 1], key, direction
+
+    def _build_page(self, rows, key, direction):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        if not rows:
+            return KeysetPage(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], self.NEXT) if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], self.PREVIOUS) if has_previous else None,
+        )
+
+    def get_page(self, cursor=None):
+        queryset, key, direction = self._page_queryset(cursor)
+        return self._build_page(list(queryset), key, direction)
+
+    async def aget_page(self, cursor=None):
+        queryset, key, direction = self._page_queryset(cursor)
+        return self._build_page([row async for row in queryset], key, direction)
+
+
+def paginate(request, queryset, sort_field, cursor_param='cursor', per_page=DEFAULT_PAGE_SIZE):
+    return KeysetPaginator(queryset, sort_field, per_page).get_page(request.GET.get(cursor_param))
+
+
+async def apaginate(request, queryset, sort_field, cursor_param='cursor', per_page=DEFAULT_PAGE_SIZE):
+    return await KeysetPaginator(queryset, sort_field, per_page).aget_page(request.GET.get(cursor_param))
+
+
+def get_catalogue_filters(request):
+    # Filtres communs aux listes du catalogue : ?media_type=book&available=true
+    media_type = request.GET.get('media_type') or None
+    available = request.GET.get('available')
+    if available is not None:
+        available = available.lower() == 'true'
+    return media_type, available
@@ -0,0 +1,85 @@
+import re
+
+from django.db import connection
+
+from mediatheque.models import Media
+
+FTS_TABLE = 'mediatheque_media_fts'
+DEFAULT_LIMIT = 50
+
+# Colonne « créateurs » de chaque type : auteur, producteur, artiste, créateurs
+CREATOR_FIELDS = ['author', 'producer', 'artist', 'creators']
+
+# Le nom pèse plus que les créateurs dans le classement bm25
+NAME_WEIGHT = 10.0
+CREATORS_WEIGHT = 5.0
+
+
+def _index_select_sql():
+    # Une ligne par média : nom + créateur de son type, dans la même table
+    creators = ', '.join(f'm.{Media._meta.get_field(name).column}' for name in CREATOR_FIELDS)
+    return f"SELECT m.id, m.name, COALESCE({creators}, '') FROM {Media._meta.db_table} m"
+
+
+def index_media(media_id):
+    # Réindexe un média (création ou modification)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [media_id])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, creators) {_index_select_sql()} WHERE m.id = %s',
+            [media_id],
+        )
+
+
+def index_new_media(media_ids):
+    # Indexe en une requête des médias créés en masse (bulk_create ne déclenche pas post_save)
+    if not media_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(media_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, creators) {_index_select_sql()} WHERE m.id IN ({placeholders})',
+            list(media_ids),
+        )
+
+
+def unindex_media(media_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [media_id])
+
+
+def rebuild_index():
+    # Reconstruit tout l'index en une requête INSERT ... SELECT, puis le compacte
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, name, creators) {_index_select_sql()}')
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def build_match_query(text):
+    # Chaque mot devient un préfixe entre guillemets : « harr pot » -> "harr"* "pot"*
+    # Les guillemets neutralisent la syntaxe FTS5 (AND, NEAR, -, ...) saisie par l'utilisateur
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_media_ids(text, limit=DEFAULT_LIMIT):
+    match = build_match_query(text)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, %s, %s) LIMIT %s',
+            [match, NAME_WEIGHT, CREATORS_WEIGHT, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_media(text, limit=DEFAULT_LIMIT):
+    # Médias correspondant à la recherche, du plus pertinent au moins pertinent
+    ids = search_media_ids(text, limit)
+    medias = Media.objects.in_bulk(ids)
+    return [medias[media_id] for media_id in ids if media_id in medias]
@@ -0,0 +1,36 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def session_table_used():
+    # Moteurs 'db' et 'cached_db' : les seuls à laisser des sessions expirées en base
+    return issubclass(import_module(settings.SESSION_ENGINE).SessionStore, DatabaseSessionStore)
+
+
+def purge_expired_sessions(now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Supprime les sessions expirées de la table django_session par lots.
+
+    Chaque lot est lu sur l'index de expire_date puis supprimé par un seul DELETE dans sa
+    propre transaction : le verrou d'écriture de SQLite est rendu entre deux lots, les
+    emprunts ne restent pas bloqués derrière une purge massive (ce que fait clearsessions).
+    Renvoie le nombre de sessions supprimées.
+    """
+    from django.contrib.sessions.models import Session
+
+    now = now or timezone.now()
+    expired = Session.objects.filter(expire_date__lt=now).order_by('expire_date')
+    total = 0
+    while True:
+        with transaction.atomic():
+            keys = list(expired.values_list('session_key', flat=True)[:chunk_size])
+            if not keys:
+                break
+            total += Session.objects.filter(session_key__in=keys).delete()[0]
+    return total
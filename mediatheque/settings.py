@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,22 +47,88 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'mediatheque.instrumentation.RequestStatsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'mediatheque.db_routers.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Mesures par vue (requêtes SQL, temps base/gabarits/total) : voir mediatheque/instrumentation.py
+# Désactivé, le middleware n'a aucun coût ; le résumé est consultable sur /staff/stats/
+REQUEST_STATS = {
+    'ENABLED': False,
+    'BUFFER_SIZE': 1000,
+    'SNAPSHOT_PATH': None,
+    'SNAPSHOT_EVERY': 500,
+}
+
+# Caches : mémoire locale par défaut (un seul processus), fichiers pour partager
+# les entrées et le compteur de version entre plusieurs processus
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mediatheque',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'mediatheque_cache',
+    },
+    # Sessions des moteurs 'cached_db' et 'cache' (voir SESSION_PROFILES)
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mediatheque-sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Sessions : moteur choisi par la variable d'environnement MEDIATHEQUE_SESSION_PROFILE.
+# 'db' : une écriture SQLite à chaque session modifiée (connexion, déconnexion, épinglage
+# sur la base principale), en concurrence avec les emprunts ; 'cached_db' : mêmes écritures,
+# lectures servies par le cache ; 'cache' : aucune écriture, sessions perdues si le cache
+# est vidé ; 'signed_cookies' : session dans un cookie signé, ni écriture ni lecture.
+# Cache des sessions : MEDIATHEQUE_SESSION_CACHE, 'sessions' (mémoire du processus) ou
+# 'shared' (fichiers, à choisir dès qu'il y a plusieurs processus).
+SESSION_PROFILES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = os.environ.get('MEDIATHEQUE_SESSION_PROFILE', 'db')
+if SESSION_PROFILE not in SESSION_PROFILES:
+    raise ImproperlyConfigured(
+        f"MEDIATHEQUE_SESSION_PROFILE inconnu : {SESSION_PROFILE!r} (choix : {', '.join(SESSION_PROFILES)})")
+SESSION_ENGINE = SESSION_PROFILES[SESSION_PROFILE]
+SESSION_CACHE_ALIAS = os.environ.get('MEDIATHEQUE_SESSION_CACHE', 'sessions')
+
+# Messages dans un cookie : jamais de repli sur la session (et d'écriture en base)
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Tableaux de bord mis en cache sous une version des données (catalogue et emprunts)
+# incrémentée à chaque écriture : voir mediatheque/caching.py
+DATA_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
 ROOT_URLCONF = 'mediatheque.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates', ],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Gabarits compilés une seule fois par processus (rechargés automatiquement par runserver)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -84,13 +154,47 @@ STATICFILES_DIRS = [
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Profil SQLite : 'default' ou 'production' (WAL, synchronous=NORMAL, busy_timeout, mmap...),
+# choisi par la variable d'environnement MEDIATHEQUE_SQLITE_PROFILE ; PRAGMA dans mediatheque/sqlite.py
+SQLITE_PROFILE = os.environ.get('MEDIATHEQUE_SQLITE_PROFILE', 'default')
+SQLITE_PRODUCTION = SQLITE_PROFILE == 'production'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Connexions conservées entre les requêtes : les PRAGMA ne sont appliqués qu'une fois
+        'CONN_MAX_AGE': 600 if SQLITE_PRODUCTION else 0,
+        'CONN_HEALTH_CHECKS': SQLITE_PRODUCTION,
+        # Verrou d'écriture pris dès BEGIN : pas d'échec immédiat quand deux transactions
+        # de lecture veulent écrire en même temps (busy_timeout ne couvre pas ce cas)
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if SQLITE_PRODUCTION else {},
+        # Base de test sur fichier (et non en mémoire) : les tests de concurrence
+        # ouvrent une connexion par thread sur la même base. Le PID dans le nom sépare
+        # les exécutions simultanées sur la même machine (copies de travail, CI).
+        'TEST': {
+            'NAME': Path(tempfile.gettempdir()) / f'mediatheque_test_{os.getpid()}.sqlite3',
+        },
     }
 }
 
+# Réplique en lecture (optionnelle) : second fichier SQLite recopié depuis la base
+# principale (python manage.py refresh_replica). Les vues de consultation y lisent,
+# les écritures restent sur 'default' : voir mediatheque/db_routers.py
+REPLICA_DATABASE = os.environ.get('MEDIATHEQUE_REPLICA_DB')
+if REPLICA_DATABASE:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': REPLICA_DATABASE,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['mediatheque.db_routers.PrimaryReplicaRouter']
+
+# Durée (s) pendant laquelle un membre qui vient d'écrire relit sur la base principale ;
+# doit dépasser l'intervalle de rafraîchissement de la réplique
+REPLICA_STICKY_SECONDS = 30
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -109,6 +213,32 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hachage des mots de passe : profil choisi par la variable d'environnement
+# MEDIATHEQUE_PASSWORD_PROFILE. 'default' : PBKDF2 de Django ; 'argon2' (paquet argon2-cffi)
+# ou 'scrypt' : coûts réglés dans authentification/hashers.py. Pas de profil MD5 : les anciens
+# hachages seraient refaits en MD5 à la connexion (les tests l'activent dans conftest.py).
+# Le premier hacheur sert aux nouveaux mots de passe, les suivants vérifient les anciens
+# hachages, refaits avec le premier à la connexion.
+_DJANGO_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_PROFILES = {
+    'default': _DJANGO_HASHERS,
+    'argon2': ['authentification.hashers.TunedArgon2PasswordHasher']
+              + [hasher for hasher in _DJANGO_HASHERS if not hasher.endswith('.Argon2PasswordHasher')],
+    'scrypt': ['authentification.hashers.TunedScryptPasswordHasher']
+              + [hasher for hasher in _DJANGO_HASHERS if not hasher.endswith('.ScryptPasswordHasher')],
+}
+PASSWORD_PROFILE = os.environ.get('MEDIATHEQUE_PASSWORD_PROFILE', 'default')
+if PASSWORD_PROFILE not in PASSWORD_PROFILES:
+    raise ImproperlyConfigured(
+        f"MEDIATHEQUE_PASSWORD_PROFILE inconnu : {PASSWORD_PROFILE!r} (choix : {', '.join(PASSWORD_PROFILES)})")
+PASSWORD_HASHERS = PASSWORD_PROFILES[PASSWORD_PROFILE]
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -127,6 +257,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'authentification.CustomUser'
 
+# Permissions lues via authentification.roles (une fois par requête, cache court)
+AUTHENTICATION_BACKENDS = ['authentification.backends.RoleBackend']
+
+# Rôle, groupes et permissions des membres en cache (alias de DATA_CACHE), voir authentification/roles.py
+ROLE_CACHE = {
+    'TIMEOUT': 60,
+}
+
 LOGIN_URL = '/auth/login/'
 
 # Où aller après connexion réussie
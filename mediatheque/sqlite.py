@@ -0,0 +1,58 @@
+import sqlite3
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from mediatheque.caching import reset_version
+
+# PRAGMA appliqués à chaque nouvelle connexion SQLite, selon settings.SQLITE_PROFILE
+SQLITE_PROFILES = {
+    # Réglages par défaut de sqlite3 (journal DELETE, fsync à chaque commit)
+    'default': {},
+    'production': {
+        # Les lecteurs ne bloquent plus l'écrivain (et inversement) ; persistant dans le fichier
+        'journal_mode': 'WAL',
+        # En WAL, plus de fsync à chaque commit : seulement aux checkpoints
+        'synchronous': 'NORMAL',
+        # Attente (ms) d'un verrou tenu par une autre connexion avant « database is locked »
+        'busy_timeout': 5000,
+        # Lecture de la base par mmap (256 Mio) plutôt que par read()
+        'mmap_size': 256 * 1024 * 1024,
+        # Cache de pages par connexion : valeur négative en Kio (64 Mio)
+        'cache_size': -64 * 1024,
+    },
+}
+
+
+def get_pragmas(profile=None):
+    return SQLITE_PROFILES[profile or getattr(settings, 'SQLITE_PROFILE', 'default')]
+
+
+def apply_sqlite_profile(sender, connection, **kwargs):
+    # Récepteur connection_created
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_pragmas()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def refresh_replica(target='replica', source=DEFAULT_DB_ALIAS):
+    """
+    Recopie la base principale dans la réplique avec l'API de sauvegarde de SQLite.
+
+    La copie est cohérente (instantané des transactions validées) et les connexions
+    ouvertes sur la réplique voient le nouveau contenu à leur prochaine lecture.
+    """
+    source_db = sqlite3.connect(connections[source].settings_dict['NAME'])
+    target_db = sqlite3.connect(connections[target].settings_dict['NAME'])
+    try:
+        source_db.backup(target_db)
+    finally:
+        target_db.close()
+        source_db.close()
+    # Les entrées calculées depuis l'ancienne copie ne doivent plus être servies
+    reset_version()
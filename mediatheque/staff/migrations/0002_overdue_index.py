@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediatheque', '0004_overdue_maintenance'),
+        ('staff', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staffborrow',
+            index=models.Index(fields=['is_returned', 'due_date'], name='staff_staff_is_retu_de4e4b_idx'),
+        ),
+    ]
@@ -0,0 +1,196 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:26
+
+from itertools import islice
+
+from django.db import migrations
+
+# Sous-classes staff et leur équivalent dans mediatheque (mêmes colonnes)
+CHILD_MODELS = [
+    ('BookStaff', 'Book'),
+    ('DVDStaff', 'DVD'),
+    ('CDStaff', 'CD'),
+    ('BoardGameStaff', 'BoardGame'),
+]
+MEDIA_FIELDS = ['name', 'available', 'media_type', 'can_borrow', 'object_id']
+BORROW_FIELDS = ['user_id', 'media_id', 'borrow_date', 'return_date', 'is_returned', 'due_date', 'is_late']
+BATCH_SIZE = 500
+
+
+def merge_staff_data(apps, schema_editor):
+    """Recopie médias et emprunts de staff dans les tables de mediatheque avant leur suppression."""
+    db = schema_editor.connection.alias
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Media = apps.get_model('mediatheque', 'Media')
+    MediathequeBorrow = apps.get_model('mediatheque', 'MediathequeBorrow')
+    MediaStaff = apps.get_model('staff', 'MediaStaff')
+    StaffBorrow = apps.get_model('staff', 'StaffBorrow')
+
+    # StaffBorrow référençait déjà mediatheque.Media : les lignes sont recopiées telles quelles
+    rows = StaffBorrow.objects.using(db).order_by('pk').values(*BORROW_FIELDS).iterator(chunk_size=BATCH_SIZE)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        MediathequeBorrow.objects.using(db).bulk_create([MediathequeBorrow(**row) for row in batch])
+
+    # Médias : de nouveaux ids, avec le ContentType du modèle de mediatheque. Aucun emprunt
+    # ne pointait sur les tables staff, rien d'autre n'est à renuméroter
+    merged = 0
+    for staff_name, name in CHILD_MODELS + [('MediaStaff', 'Media')]:
+        staff_model = apps.get_model('staff', staff_name)
+        model = apps.get_model('mediatheque', name)
+        content_type, _ = ContentType.objects.db_manager(db).get_or_create(app_label='mediatheque',
+                                                                           model=name.lower())
+        fields = MEDIA_FIELDS + [field.name for field in model._meta.local_concrete_fields
+                                 if model is not Media and not field.primary_key]
+        queryset = staff_model.objects.using(db)
+        if staff_model is MediaStaff:
+            # Médias sans sous-classe uniquement
+            queryset = queryset.filter(**{f'{child.lower()}__isnull': True for child, _ in CHILD_MODELS})
+        # bulk_create refuse l'héritage multi-table : une création par média
+        for row in queryset.order_by('pk').values(*fields).iterator(chunk_size=BATCH_SIZE):
+            model.objects.using(db).create(content_type=content_type, **row)
+            merged += 1
+
+    if merged:
+        # Les médias recopiés entrent dans l'index plein texte
+        schema_editor.execute('DELETE FROM mediatheque_media_fts')
+        schema_editor.execute(
+            "INSERT INTO mediatheque_media_fts (rowid, name, creators) "
+            "SELECT m.id, m.name, COALESCE(b.author, d.producer, c.artist, g.creators, '') "
+            "FROM mediatheque_media m "
+            "LEFT JOIN mediatheque_book b ON b.media_ptr_id = m.id "
+            "LEFT JOIN mediatheque_dvd d ON d.media_ptr_id = m.id "
+            "LEFT JOIN mediatheque_cd c ON c.media_ptr_id = m.id "
+            "LEFT JOIN mediatheque_boardgame g ON g.media_ptr_id = m.id"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        # Les compteurs d'emprunts sont initialisés en comptant StaffBorrow comme une table à
+        # part : ils doivent l'être avant qu'elle devienne un proxy de MediathequeBorrow
+        ('authentification', '0002_borrow_counters'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('mediatheque', '0004_overdue_maintenance'),
+        ('staff', '0002_overdue_index'),
+    ]
+
+    operations = [
+        # Retour arrière : les tables staff sont recréées vides, les lignes fusionnées restent
+        migrations.RunPython(merge_staff_data, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='staffborrow',
+            name='staff_staff_user_id_e6c704_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='staffborrow',
+            name='staff_staff_is_retu_de4e4b_idx',
+        ),
+        migrations.RemoveField(
+            model_name='bookstaff',
+            name='mediastaff_ptr',
+        ),
+        migrations.RemoveField(
+            model_name='cdstaff',
+            name='mediastaff_ptr',
+        ),
+        migrations.RemoveField(
+            model_name='dvdstaff',
+            name='mediastaff_ptr',
+        ),
+        migrations.RemoveField(
+            model_name='mediastaff',
+            name='content_type',
+        ),
+        migrations.RemoveField(
+            model_name='staffborrow',
+            name='media',
+        ),
+        migrations.RemoveField(
+            model_name='staffborrow',
+            name='user',
+        ),
+        migrations.DeleteModel(
+            name='BoardGameStaff',
+        ),
+        migrations.DeleteModel(
+            name='BookStaff',
+        ),
+        migrations.DeleteModel(
+            name='CDStaff',
+        ),
+        migrations.DeleteModel(
+            name='DVDStaff',
+        ),
+        migrations.DeleteModel(
+            name='MediaStaff',
+        ),
+        migrations.DeleteModel(
+            name='StaffBorrow',
+        ),
+        migrations.CreateModel(
+            name='BoardGameStaff',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.boardgame',),
+        ),
+        migrations.CreateModel(
+            name='BookStaff',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.book',),
+        ),
+        migrations.CreateModel(
+            name='CDStaff',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.cd',),
+        ),
+        migrations.CreateModel(
+            name='DVDStaff',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.dvd',),
+        ),
+        migrations.CreateModel(
+            name='MediaStaff',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.media',),
+        ),
+        migrations.CreateModel(
+            name='StaffBorrow',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('mediatheque.mediathequeborrow',),
+        ),
+    ]
@@ -0,0 +1,35 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.urls import reverse
+from mediatheque.models import Book, Media, MediathequeBorrow
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_borrow_and_return_views(client, staff_user):
+    book = Book.objects.create(name='Livre', author='Auteur')
+    client.force_login(staff_user)
+
+    response = client.post(reverse('borrow_media', args=[book.pk]))
+    assert response.status_code == 302
+    borrow = MediathequeBorrow.objects.get(media_id=book.pk)
+    assert not Media.objects.get(pk=book.pk).available
+
+    # Un second emprunt du même média est refusé avec un message
+    response = client.post(reverse('borrow_media', args=[book.pk]))
+    messages = [str(message) for message in get_messages(response.wsgi_request)]
+    assert any('déjà emprunté' in message for message in messages)
+
+    response = client.post(reverse('return_media', args=[borrow.pk]))
+    assert response.status_code == 302
+    assert Media.objects.get(pk=book.pk).available
+
+
+@pytest.mark.django_db
+def test_borrow_and_return_views_unknown_ids(client, staff_user):
+    client.force_login(staff_user)
+
+    assert client.post(reverse('borrow_media', args=[999])).status_code == 404
+    assert client.post(reverse('return_media', args=[999])).status_code == 404
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.models import Book, CD, MediathequeBorrow
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalogue(staff_user):
+    book = Book.objects.create(name='Germinal', author='Émile Zola')
+    cd = CD.objects.create(name='Thriller', artist='Michael Jackson')
+    january = timezone.make_aware(datetime(2025, 1, 15, 10, 0))
+    MediathequeBorrow.objects.create(user=staff_user, media=book, borrow_date=january)
+    MediathequeBorrow.objects.create(user=staff_user, media=cd, borrow_date=january + timedelta(days=60))
+    return book, cd
+
+
+def content(response):
+    assert response.streaming
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_media_csv_includes_subclass_fields(client, staff_user, catalogue, django_assert_num_queries):
+    client.force_login(staff_user)
+    response = client.get(reverse('export_media', args=['csv']))
+
+    # Tout le catalogue est lu par une seule requête, sans instancier de modèles
+    with django_assert_num_queries(1):
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+
+    assert response['Content-Type'].startswith('text/csv')
+    assert [(row['name'], row['author'], row['artist']) for row in rows] == [
+        ('Germinal', 'Émile Zola', ''),
+        ('Thriller', '', 'Michael Jackson'),
+    ]
+
+
+@pytest.mark.django_db
+def test_export_borrows_ndjson_filters(client, staff_user, catalogue):
+    client.force_login(staff_user)
+
+    response = client.get(reverse('export_borrows', args=['ndjson']), {'from': '2025-01-01', 'to': '2025-01-31'})
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row['media_name'] for row in rows] == ['Germinal']
+    assert rows[0]['borrow_date'].startswith('2025-01-15')
+
+    response = client.get(reverse('export_borrows', args=['ndjson']), {'media_type': 'cd'})
+    assert [json.loads(line)['media_name'] for line in content(response).splitlines()] == ['Thriller']
+
+
+@pytest.mark.django_db
+def test_export_rejects_bad_requests(client, staff_user):
+    member = User.objects.create_user(username='member', password='password123')
+    client.force_login(member)
+    assert client.get(reverse('export_media', args=['csv'])).status_code == 403
+
+    client.force_login(staff_user)
+    assert client.get(reverse('export_media', args=['xml'])).status_code == 404
+    assert client.get(reverse('export_borrows', args=['csv']), {'from': '15/01/2025'}).status_code == 400
+    assert client.get(reverse('export_borrows', args=['csv']), {'to': '2024-02-30'}).status_code == 400
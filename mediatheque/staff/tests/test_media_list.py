@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.models import Book, MediathequeBorrow
+
+User = get_user_model()
+
+
+def create_catalogue(size, borrower):
+    # Crée `size` livres, dont un sur deux est emprunté
+    for i in range(size):
+        book = Book.objects.create(name=f'Livre {i}', author='Auteur')
+        if i % 2 == 0:
+            MediathequeBorrow.objects.create(user=borrower, media=book, borrow_date=timezone.now())
+
+
+def count_media_list_queries(client):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse('media_list'))
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_media_list_shows_active_borrow(client, staff_user):
+    create_catalogue(2, staff_user)
+    client.force_login(staff_user)
+
+    response = client.get(reverse('media_list'))
+
+    assert response.status_code == 200
+    statuses = {status['media'].name: status for status in response.context['media_status']}
+    assert statuses['Livre 0']['is_borrowed']
+    assert statuses['Livre 0']['borrower'] == staff_user
+    assert not statuses['Livre 1']['is_borrowed']
+    assert 'Emprunté par staffuser' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_media_list_query_count_is_constant(client, staff_user):
+    client.force_login(staff_user)
+
+    create_catalogue(2, staff_user)
+    small_catalogue_queries = count_media_list_queries(client)
+
+    create_catalogue(30, staff_user)
+    large_catalogue_queries = count_media_list_queries(client)
+
+    # Le nombre de requêtes ne doit pas dépendre de la taille du catalogue
+    assert small_catalogue_queries == large_catalogue_queries
+
+
+@pytest.mark.django_db
+def test_with_active_borrow_ignores_returned_borrows(staff_user):
+    create_catalogue(1, staff_user)
+    MediathequeBorrow.objects.update(is_returned=True, return_date=timezone.now())
+
+    media = Book.objects.with_active_borrow().get()
+
+    assert media.active_borrow is None
+
+
+@pytest.mark.django_db
+def test_media_list_hides_borrowers_from_clients(client, staff_user):
+    create_catalogue(2, staff_user)
+    member = User.objects.create_user(username='membre', password='password123')
+    member.groups.add(Group.objects.get(name='client'))
+    client.force_login(member)
+
+    response = client.get(reverse('media_list'))
+
+    assert response.status_code == 200
+    statuses = {status['media'].name: status for status in response.context['media_status']}
+    assert statuses['Livre 0']['is_borrowed']
+    assert statuses['Livre 0']['borrower'] is None
+    content = response.content.decode()
+    assert 'Emprunté' in content and 'staffuser' not in content
@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import export_views, media_views, stats_views
+
+urlpatterns = [
+    path('medias/', media_views.media_list, name='media_list'),
+    path('medias/recherche/', media_views.media_search, name='media_search'),
+    path('medias/ajouter/', media_views.add_media, name='add_media'),
+    path('medias/<int:pk>/emprunter/', media_views.borrow_media, name='borrow_media'),
+    path('emprunts/<int:borrow_id>/', media_views.borrow_detail, name='borrow_detail'),
+    path('emprunts/<int:pk>/retour/', media_views.return_media, name='return_media'),
+    path('export/medias.<str:export_format>', export_views.export_media, name='export_media'),
+    path('export/emprunts.<str:export_format>', export_views.export_borrows, name='export_borrows'),
+    path('stats/', stats_views.request_stats_view, name='request_stats'),
+]
@@ -0,0 +1,40 @@
+from django.contrib.auth.decorators import permission_required
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from mediatheque.export import (BORROW_COLUMNS, CATALOGUE_COLUMNS, STREAMERS, borrow_rows,
+                                catalogue_rows)
+
+
+def _streaming_response(columns, rows, export_format, filename):
+    if export_format not in STREAMERS:
+        raise Http404("Format d'export inconnu.")
+    streamer, content_type = STREAMERS[export_format]
+    response = StreamingHttpResponse(streamer(columns, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+# Export du catalogue (Media + champs des sous-classes) en CSV ou NDJSON
+@permission_required('authentification.can_export_data', raise_exception=True)
+def export_media(request, export_format):
+    rows = catalogue_rows(media_type=request.GET.get('media_type') or None)
+    return _streaming_response(CATALOGUE_COLUMNS, rows, export_format, 'catalogue')
+
+
+# Export de l'historique des emprunts, filtrable par période d'emprunt (?from=AAAA-MM-JJ&to=AAAA-MM-JJ)
+@permission_required('authentification.can_export_data', raise_exception=True)
+def export_borrows(request, export_format):
+    dates = {}
+    for param in ('from', 'to'):
+        value = request.GET.get(param)
+        try:
+            dates[param] = parse_date(value) if value else None
+        except ValueError:
+            # Bien formée mais impossible (2024-02-30)
+            dates[param] = None
+        if value and dates[param] is None:
+            return HttpResponseBadRequest(f"Date invalide pour « {param} » (format attendu : AAAA-MM-JJ).")
+
+    rows = borrow_rows(media_type=request.GET.get('media_type') or None,
+                       date_from=dates['from'], date_to=dates['to'])
+    return _streaming_response(BORROW_COLUMNS, rows, export_format, 'emprunts')
@@ -1,13 +1,17 @@
-from django.shortcuts import get_object_or_404, redirect, render
-from django.utils import timezone
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.template.response import TemplateResponse
 from django.contrib.auth import get_user_model
 from django import forms
 from django.contrib.auth.decorators import permission_required
 from django.contrib import messages
-from mediatheque.staff.models import Media, Borrow, BoardGame
+from mediatheque import borrowing
+from mediatheque.db_routers import read_from_replica
+from mediatheque.models import ArchivedBorrow, Media, MediathequeBorrow as Borrow, BoardGame
+from mediatheque.pagination import apaginate, get_catalogue_filters
+from mediatheque.search import search_media
 
 User = get_user_model()
-MAX_BORROW_DURATION_DAYS = 7
 
 
 class MediaForm(forms.ModelForm):
@@ -23,7 +27,7 @@ class BoardGameForm(forms.ModelForm):
 
 
 # Ajout d'un média
-@permission_required('authentication.can_add_media', raise_exception=True)
+@permission_required('authentification.can_add_media', raise_exception=True)
 def add_media(request):
     if request.method == 'POST':
         media_form = MediaForm(request.POST)
@@ -53,90 +57,79 @@ def add_media(request):
 
 
 # Emprunter un média
-@permission_required('authentication.can_borrow_media', raise_exception=True)
+@permission_required('authentification.can_borrow_media', raise_exception=True)
 def borrow_media(request, pk):
     if request.method == 'POST':
-        media = get_object_or_404(Media, pk=pk)
-
-        # Vérifier si le média est un BoardGame et s'il peut être emprunté
-        if isinstance(media, BoardGame) and not media.can_borrow():
-            messages.error(request, 'Les jeux de plateau ne peuvent pas être empruntés.')
-            return redirect('media_list')
-
-        # Vérifier si l'utilisateur a déjà 3 emprunts en cours
-        if not Borrow.can_borrow(request.user):
-            messages.error(request,
-                           'Vous ne pouvez pas emprunter plus de 3 médias à la fois ou vous avez des emprunts en retard.')
+        # Vérifications, création de l'emprunt et indisponibilité du média dans une seule transaction
+        try:
+            borrow = borrowing.borrow_media(request.user, pk)
+        except Media.DoesNotExist:
+            raise Http404("Média introuvable.")
+        except borrowing.BorrowError as error:
+            messages.error(request, str(error))
             return redirect('media_list')
 
-        # Calculer la date d'échéance en fonction de la constante
-        due_date = timezone.now() + timezone.timedelta(days=MAX_BORROW_DURATION_DAYS)
-
-        # Créer l'emprunt si toutes les conditions sont validées
-        Borrow.objects.create(
-            user=request.user,
-            media=media,
-            borrow_date=timezone.now(),
-            due_date=due_date
-        )
-
-        # Mettre à jour la disponibilité du média
-        media.available = False
-        media.save()
-
         messages.success(request,
-                         f"Le média '{media.name}' a été emprunté avec succès. Vous devez le rendre avant le {due_date.date()}.")
+                         f"Le média '{borrow.media.name}' a été emprunté avec succès. "
+                         f"Vous devez le rendre avant le {borrow.due_date.date()}.")
 
     return redirect('media_list')
 
 
 # Détail de l'emprunt
-@permission_required('authentication.can_view_borrow', raise_exception=True)
-def borrow_detail(request, borrow_id):
-    borrow = get_object_or_404(Borrow.objects.select_related('media'), id=borrow_id)
-    return render(request, 'borrow_detail.html', {'borrow': borrow})
+@permission_required('authentification.can_view_borrow', raise_exception=True)
+@read_from_replica
+async def borrow_detail(request, borrow_id):
+    # Utilisateur chargé une fois ici : le rendu du gabarit (user.is_authenticated...) ne le relit pas
+    request.user = await request.auser()
+    borrow = await Borrow.objects.select_related('media', 'user').filter(id=borrow_id).afirst()
+    if borrow is None:
+        # Emprunt rendu puis archivé : mêmes champs, même id (voir mediatheque/archive.py)
+        borrow = await aget_object_or_404(ArchivedBorrow.objects.select_related('media', 'user'), id=borrow_id)
+    # TemplateResponse : le rendu (et ses accès synchrones à la session) est fait par le gestionnaire
+    return TemplateResponse(request, 'media/borrow_detail.html', {'borrow': borrow})
 
 
 # Retourner un emprunt
-@permission_required('authentication.can_return_media', raise_exception=True)
+@permission_required('authentification.can_return_media', raise_exception=True)
 def return_media(request, pk):
     if request.method == 'POST':
-        borrow = get_object_or_404(Borrow, pk=pk, is_returned=False)
-        borrow.is_returned = True
-        borrow.return_date = timezone.now()
-        borrow.save()
-        borrow.media.available = True
-        borrow.media.save()
+        try:
+            borrowing.return_borrow(pk)
+        except Borrow.DoesNotExist:
+            raise Http404("Emprunt introuvable.")
 
         messages.success(request, "Le média a été retourné avec succès.")
     return redirect('media_list')
 
 
 # Liste des médias avec filtres
-@permission_required('authentication.can_view_media', raise_exception=True)
-def media_list(request):
+@permission_required('authentification.can_view_media', raise_exception=True)
+@read_from_replica
+async def media_list(request):
+    request.user = await request.auser()
     # Récupération des filtres
-    media_type_filter = request.GET.get('media_type', None)
-    available_filter = request.GET.get('available', None)
-
-    medias = Media.objects.all().prefetch_related('borrow_set')
+    media_type_filter, available_filter = get_catalogue_filters(request)
 
-    if media_type_filter:
-        medias = medias.filter(media_type=media_type_filter)
+    # L'emprunt en cours et l'emprunteur sont préchargés : nombre de requêtes constant
+    # polymorphic() : chaque ligne est un Book, DVD... sans requête supplémentaire
+    medias = Media.objects.filter_catalogue(media_type_filter, available_filter).with_active_borrow()
+    medias = medias.polymorphic()
 
-    if available_filter is not None:
-        available_filter = available_filter.lower() == 'true'
-        medias = medias.filter(available=available_filter)
+    # Pagination par clé (name, id) : ?cursor=...
+    page = await apaginate(request, medias, 'name')
+    # Le groupe client voit le catalogue, pas qui a emprunté quoi
+    show_borrower = await request.user.ahas_perm('authentification.can_view_borrow')
 
     # Ajouter un statut d'emprunt pour chaque média
     media_status = []
-    for media in medias:
-        borrow = media.borrow_set.filter(is_returned=False).first()
+    for media in page:
+        borrow = media.active_borrow
         if borrow:
             media_status.append({
                 'media': media,
                 'is_borrowed': True,
-                'borrower': borrow.user,
+                'borrower': borrow.user if show_borrower else None,
                 'borrow_date': borrow.borrow_date,
                 'due_date': borrow.due_date
             })
@@ -146,6 +139,15 @@ def media_list(request):
                 'is_borrowed': False
             })
 
-    return render(request, 'staff/media_list.html',
-                  {'media_status': media_status, 'media_type_filter': media_type_filter,
-                   'available_filter': available_filter})
+    return TemplateResponse(request, 'media/media_list.html',
+                            {'media_status': media_status, 'page': page, 'media_type_filter': media_type_filter,
+                             'available_filter': available_filter})
+
+
+# Recherche plein texte dans le catalogue (nom, auteur, producteur, artiste, créateurs)
+@permission_required('authentification.can_view_media', raise_exception=True)
+def media_search(request):
+    query = request.GET.get('q', '').strip()
+    results = search_media(query) if query else []
+
+    return render(request, 'media/media_search.html', {'query': query, 'results': results})
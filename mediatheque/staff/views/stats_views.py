@@ -0,0 +1,13 @@
+from django.contrib.auth.decorators import permission_required
+from django.http import JsonResponse
+from mediatheque.instrumentation import get_config, request_stats
+
+
+# Résumé des mesures par vue (percentiles), collectées par RequestStatsMiddleware
+@permission_required('authentification.can_view_stats', raise_exception=True)
+def request_stats_view(request):
+    return JsonResponse({
+        'enabled': get_config()['ENABLED'],
+        'requests': request_stats.total,
+        'views': request_stats.summary(),
+    })
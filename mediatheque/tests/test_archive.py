@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.archive import archive_returned_borrows, member_history
+from mediatheque.export import borrow_rows
+from mediatheque.models import ArchivedBorrow, Book, MediathequeBorrow
+
+User = get_user_model()
+
+
+def create_borrow(member, returned_days_ago=None):
+    now = timezone.now()
+    book = Book.objects.create(name='Livre', author='Auteur')
+    if returned_days_ago is None:
+        return MediathequeBorrow.objects.create(user=member, media=book, due_date=now + timedelta(days=7))
+    return_date = now - timedelta(days=returned_days_ago)
+    return MediathequeBorrow.objects.create(
+        user=member, media=book, borrow_date=return_date - timedelta(days=5),
+        due_date=return_date + timedelta(days=2), return_date=return_date, is_returned=True,
+    )
+
+
+@pytest.mark.django_db
+def test_archive_moves_old_returned_borrows_in_chunks(member):
+    old = [create_borrow(member, returned_days_ago=400) for _ in range(5)]
+    recent = create_borrow(member, returned_days_ago=10)
+    active = create_borrow(member)
+
+    with CaptureQueriesContext(connection) as context:
+        assert archive_returned_borrows(before=timezone.now() - timedelta(days=365), chunk_size=2) == 5
+
+    # Par lot : un INSERT ... SELECT et un DELETE
+    writes = [query['sql'].split()[0] for query in context.captured_queries
+              if query['sql'].startswith(('INSERT', 'DELETE'))]
+    assert writes == ['INSERT', 'DELETE'] * 3
+
+    assert set(MediathequeBorrow.objects.values_list('pk', flat=True)) == {recent.pk, active.pk}
+    archived = ArchivedBorrow.objects.get(pk=old[0].pk)
+    assert (archived.user_id, archived.media_id, archived.return_date) == (member.pk, old[0].media_id,
+                                                                          old[0].return_date)
+    assert archived.is_returned
+
+
+@pytest.mark.django_db
+def test_new_borrow_gets_a_fresh_id_after_archiving(member):
+    # AUTOINCREMENT : l'id d'un emprunt archivé, même le plus grand, n'est pas réattribué
+    create_borrow(member, returned_days_ago=400)
+    last = create_borrow(member, returned_days_ago=400)
+
+    call_command('archive_borrows', older_than_days=365)
+
+    assert not MediathequeBorrow.objects.exists()
+    assert ArchivedBorrow.objects.filter(pk=last.pk).exists()
+    assert create_borrow(member).pk > last.pk
+
+
+@pytest.mark.django_db
+def test_history_reads_active_and_archived_borrows(member, admin_client):
+    archived = create_borrow(member, returned_days_ago=400)
+    active = create_borrow(member)
+    create_borrow(User.objects.create_user(username='autre'), returned_days_ago=400)
+    archive_returned_borrows(before=timezone.now() - timedelta(days=365))
+
+    assert [row[0] for row in member_history(member)] == [active.pk, archived.pk]
+    assert [row[0] for row in borrow_rows()] == sorted(
+        list(MediathequeBorrow.objects.values_list('pk', flat=True))
+        + list(ArchivedBorrow.objects.values_list('pk', flat=True)))
+
+    response = admin_client.get(reverse('borrow_detail', args=[archived.pk]))
+    assert response.status_code == 200
+    assert 'Retourné le' in response.content.decode()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.models import Book, MediathequeBorrow
+
+User = get_user_model()
+
+
+@pytest.fixture
+def borrow(staff_user):
+    book = Book.objects.create(name='Dune', author='Herbert', available=False)
+    now = timezone.now()
+    return MediathequeBorrow.objects.create(user=staff_user, media=book, borrow_date=now - timedelta(days=10),
+                                            due_date=now - timedelta(days=3))
+
+
+def asgi_get(user, url):
+    # Chemin ASGI complet (ASGIHandler) : les vues asynchrones ne passent pas par un thread
+    client = AsyncClient()
+    async_to_sync(client.aforce_login)(user)
+    return async_to_sync(client.get)(url)
+
+
+@pytest.mark.django_db
+def test_async_views_under_asgi(staff_user, borrow):
+    dashboard = asgi_get(staff_user, reverse('authentification:espace_staff')).content.decode()
+    assert 'Emprunts en retard' in dashboard
+    assert dashboard.count('Dune') == 3  # en cours, en retard, catalogue
+
+    media_list = asgi_get(staff_user, reverse('media_list')).content.decode()
+    assert 'Emprunté par staff' in media_list
+
+    detail = asgi_get(staff_user, reverse('borrow_detail', args=[borrow.pk])).content.decode()
+    assert 'Emprunteur : <strong>staffuser</strong>' in detail
+    assert 'En retard' not in detail  # is_late n'est posé que par le traitement des retards
+
+    assert asgi_get(staff_user, reverse('borrow_detail', args=[999])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_views_under_wsgi(client, staff_user, borrow):
+    client.force_login(staff_user)
+
+    response = client.get(reverse('borrow_detail', args=[borrow.pk]))
+    assert response.status_code == 200
+    assert 'Dune' in response.content.decode()
+    assert 'Emprunté par staff' in client.get(reverse('media_list')).content.decode()
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from mediatheque.borrowing import borrow_media, reconcile_borrow_counters, return_borrow
+from mediatheque.models import Book, MediathequeBorrow
+from mediatheque.overdue import mark_overdue_borrows
+from staff.models import StaffBorrow
+
+User = get_user_model()
+
+
+def counters(user):
+    user.refresh_from_db()
+    return user.active_borrow_count, user.late_borrow_count
+
+
+@pytest.mark.django_db
+def test_counters_follow_borrow_late_and_return(member):
+    book = Book.objects.create(name='Livre', author='Auteur')
+    borrow = borrow_media(member, book.pk, now=timezone.now() - timedelta(days=10))
+    assert counters(member) == (1, 0)
+
+    mark_overdue_borrows(MediathequeBorrow)
+    assert counters(member) == (1, 1)
+    assert not MediathequeBorrow.can_borrow(member)
+
+    return_borrow(borrow.pk)
+    assert counters(member) == (0, 0)
+    assert MediathequeBorrow.can_borrow(member)
+
+
+@pytest.mark.django_db
+def test_can_borrow_is_a_single_query(member, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert MediathequeBorrow.can_borrow(member)
+    with django_assert_num_queries(1):
+        assert StaffBorrow.can_borrow(member)
+
+
+@pytest.mark.django_db
+def test_reconcile_reports_and_fixes_drift(member):
+    book = Book.objects.create(name='Livre', author='Auteur')
+    # Emprunts créés hors du service : les compteurs ne sont pas à jour
+    MediathequeBorrow.objects.create(user=member, media=book, is_late=True,
+                                     due_date=timezone.now() - timedelta(days=1))
+    StaffBorrow.objects.create(user=member, media=book, due_date=timezone.now())
+
+    assert reconcile_borrow_counters(fix=False) == [(member.pk, (0, 0), (2, 1))]
+    assert counters(member) == (0, 0)
+
+    output = StringIO()
+    call_command('reconcile_borrow_counters', stdout=output)
+
+    assert f'Membre {member.pk}' in output.getvalue()
+    assert counters(member) == (2, 1)
+    assert reconcile_borrow_counters() == []
+
+
+@pytest.mark.django_db
+def test_deleting_active_borrows_releases_counters(member):
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur') for i in range(3)]
+    borrows = [borrow_media(member, book.pk, now=timezone.now() - timedelta(days=10)) for book in books]
+    mark_overdue_borrows(MediathequeBorrow)
+    return_borrow(borrows[2].pk)
+    assert counters(member) == (2, 2)
+
+    # Suppression directe d'un emprunt en retard, puis en cascade depuis le média
+    MediathequeBorrow.objects.get(pk=borrows[0].pk).delete()
+    assert counters(member) == (1, 1)
+    books[1].delete()
+    assert counters(member) == (0, 0)
+
+    # L'emprunt rendu ne comptait plus : sa suppression ne change rien
+    MediathequeBorrow.objects.filter(pk=borrows[2].pk).delete()
+    assert counters(member) == (0, 0)
+    assert reconcile_borrow_counters() == []
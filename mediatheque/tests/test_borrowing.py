@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from mediatheque.borrowing import BorrowError, borrow_media, return_borrow
+from mediatheque.models import Book, BoardGame, Media, MediathequeBorrow
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_borrow_media_creates_borrow_and_flips_availability(member):
+    book = Book.objects.create(name='Livre', author='Auteur')
+
+    borrow = borrow_media(member, book.pk)
+
+    assert borrow.user == member and not borrow.is_returned
+    assert borrow.due_date > borrow.borrow_date
+    assert not Media.objects.get(pk=book.pk).available
+
+
+@pytest.mark.django_db
+def test_borrow_media_refuses_borrowed_media(member):
+    book = Book.objects.create(name='Livre', author='Auteur')
+    borrow_media(member, book.pk)
+    other = User.objects.create_user(username='other', password='password123')
+
+    with pytest.raises(BorrowError, match='déjà emprunté'):
+        borrow_media(other, book.pk)
+
+
+@pytest.mark.django_db
+def test_borrow_media_refuses_board_games_and_unknown_media(member):
+    game = BoardGame.objects.create(name='Jeu', creators='Créateur')
+
+    with pytest.raises(BorrowError, match='jeux de plateau'):
+        borrow_media(member, game.pk)
+    with pytest.raises(Media.DoesNotExist):
+        borrow_media(member, game.pk + 1000)
+
+
+@pytest.mark.django_db
+def test_borrow_limit_rolls_back_availability(member):
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur') for i in range(4)]
+    for book in books[:3]:
+        borrow_media(member, book.pk)
+
+    with pytest.raises(BorrowError, match='plus de 3'):
+        borrow_media(member, books[3].pk)
+
+    assert Media.objects.get(pk=books[3].pk).available
+    assert MediathequeBorrow.objects.filter(user=member).count() == 3
+
+
+@pytest.mark.django_db
+def test_return_borrow_makes_media_available_again(member):
+    book = Book.objects.create(name='Livre', author='Auteur')
+    borrow = borrow_media(member, book.pk)
+
+    return_borrow(borrow.pk)
+
+    assert MediathequeBorrow.objects.get(pk=borrow.pk).is_returned
+    assert Media.objects.get(pk=book.pk).available
+    with pytest.raises(MediathequeBorrow.DoesNotExist):
+        return_borrow(borrow.pk)
+
+
+def run_concurrently(attempts):
+    # Lance chaque tentative dans son propre thread (donc sa propre connexion SQLite)
+    results = []
+    barrier = threading.Barrier(len(attempts))
+
+    def worker(user, media_id):
+        barrier.wait()
+        try:
+            borrow_media(user, media_id)
+            results.append('ok')
+        except BorrowError:
+            results.append('refused')
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=attempt) for attempt in attempts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_borrows_never_double_lend():
+    book = Book.objects.create(name='Livre', author='Auteur')
+    members = [User.objects.create_user(username=f'member{i}', password='x') for i in range(8)]
+
+    results = run_concurrently([(member, book.pk) for member in members])
+
+    assert results.count('ok') == 1
+    assert MediathequeBorrow.objects.filter(media_id=book.pk, is_returned=False).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_borrows_respect_member_limit(member):
+    books = [Book.objects.create(name=f'Livre {i}', author='Auteur') for i in range(8)]
+
+    results = run_concurrently([(member, book.pk) for book in books])
+
+    assert results.count('ok') == 3
+    assert MediathequeBorrow.objects.filter(user=member, is_returned=False).count() == 3
+    assert Media.objects.filter(available=False).count() == 3
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from authentification.views import _seconds_until_next_due
+from mediatheque import borrowing, caching
+from mediatheque.models import Book, Media, MediathequeBorrow
+from staff.models import StaffBorrow
+
+User = get_user_model()
+
+
+@pytest.fixture
+def staff_client(client):
+    user = User.objects.create_user(username='staff', password='password123')
+    user.groups.add(Group.objects.get_or_create(name='staff')[0])
+    client.force_login(user)
+    return client
+
+
+def test_cached_value_is_computed_once_per_version():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert caching.cached('test', ['a'], compute) == 1
+    assert caching.cached('test', ['a'], compute) == 1
+    assert caching.cached('test', ['b'], compute) == 2
+
+    caching.reset_version()
+    assert caching.cached('test', ['a'], compute) == 3
+
+
+def test_lost_version_key_never_reuses_old_entries():
+    caching.cached('test', [], lambda: 'ancien')
+    caching.get_cache().delete(caching.VERSION_KEY)
+
+    assert caching.cached('test', [], lambda: 'nouveau') == 'nouveau'
+
+
+@pytest.mark.django_db
+def test_model_writes_bump_version_after_commit(django_capture_on_commit_callbacks):
+    user = User.objects.create_user(username='membre', password='password123')
+    version = caching.current_version()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        book = Book.objects.create(name='Dune', author='Herbert')
+    assert caching.current_version() > version
+
+    version = caching.current_version()
+    with django_capture_on_commit_callbacks(execute=True):
+        StaffBorrow.objects.create(user=user, media=book, borrow_date=timezone.now(),
+                                   due_date=timezone.now() + timedelta(days=7))
+    assert caching.current_version() > version
+
+    # Une transaction annulée n'invalide rien
+    version = caching.current_version()
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Book.objects.create(name='Annulé', author='Personne')
+                raise RuntimeError
+    assert caching.current_version() == version
+
+
+@pytest.mark.django_db
+def test_update_based_services_bump_version(django_capture_on_commit_callbacks):
+    user = User.objects.create_user(username='membre', password='password123')
+    media = Media.objects.create(name='Dune', available=True, can_borrow=True)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        borrow = borrowing.borrow_media(user, media.pk)
+
+    version = caching.current_version()
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        borrowing.return_borrow(borrow.pk)
+    assert callbacks
+    assert caching.current_version() > version
+
+
+@pytest.mark.django_db
+def test_staff_dashboard_is_served_from_cache_until_data_changes(
+        staff_client, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    Media.objects.create(name='Dune', available=True, can_borrow=True)
+    url = reverse('authentification:espace_staff')
+
+    first = staff_client.get(url)
+    assert 'Dune' in first.content.decode()
+
+    # Seules restent les requêtes de session, d'utilisateur et de groupe
+    with django_assert_max_num_queries(3):
+        cached_response = staff_client.get(url)
+    assert cached_response.content == first.content
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Media.objects.create(name='Fondation', available=True, can_borrow=True)
+    assert 'Fondation' in staff_client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_overdue_entry_expires_at_next_due_date():
+    user = User.objects.create_user(username='membre', password='password123')
+    media = Media.objects.create(name='Dune')
+    now = timezone.now()
+    MediathequeBorrow.objects.create(user=user, media=media, borrow_date=now,
+                                     due_date=now + timedelta(minutes=10))
+
+    assert async_to_sync(_seconds_until_next_due)(now) == 600
+    assert async_to_sync(_seconds_until_next_due)(now + timedelta(minutes=11)) is None
+
+
+@pytest.mark.django_db
+def test_cached_media_fragment_follows_data_version(staff_client, django_capture_on_commit_callbacks):
+    book = Book.objects.create(name='Dune', author='Herbert')
+    url = reverse('authentification:espace_staff')
+    assert 'Dune' in staff_client.get(url).content.decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        book.name = 'Le Messie de Dune'
+        book.save()
+
+    content = staff_client.get(url).content.decode()
+    assert 'Le Messie de Dune' in content
+    assert reverse('borrow_media', args=[book.pk]) in content
+    assert book.get_media_type_display() == 'Book'
@@ -0,0 +1,43 @@
+import pytest
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models.signals import post_migrate
+from django.test.utils import CaptureQueriesContext
+from mediatheque import content_types
+from mediatheque.models import Book, BoardGame, CD, DVD, Media
+from staff.models import BookStaff, BoardGameStaff
+
+
+def content_type_queries(context):
+    return [query['sql'] for query in context.captured_queries if 'django_content_type' in query['sql']]
+
+
+@pytest.mark.django_db
+def test_media_saves_do_not_query_content_types():
+    content_types.warm_content_type_ids()
+    models = (Book, DVD, CD, BoardGame, Media, BookStaff, BoardGameStaff)
+
+    with CaptureQueriesContext(connection) as context:
+        created = [model.objects.create(name='Média') for model in models]
+        for media in type(created[0]).objects.all():
+            media.save()
+
+    assert content_type_queries(context) == []
+    # Chaque type garde son ContentType ; les proxys staff enregistrent celui de leur type
+    expected = (Book, DVD, CD, BoardGame, Media, Book, BoardGame)
+    for model, media in zip(expected, created):
+        assert media.content_type_id == ContentType.objects.get_for_model(model, for_concrete_model=False).pk
+
+
+@pytest.mark.django_db
+def test_cache_is_cleared_after_migrate():
+    content_types.warm_content_type_ids()
+    app_config = apps.get_app_config('mediatheque')
+
+    post_migrate.send(sender=app_config, app_config=app_config, verbosity=0, interactive=False,
+                      using='default', apps=apps, plan=[])
+
+    assert not content_types._content_type_ids
+    # Rechargé en une requête au premier besoin
+    assert content_types.content_type_id_for(Book) == ContentType.objects.get_for_model(Book, for_concrete_model=False).pk
@@ -0,0 +1,77 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mediatheque.importer import import_media
+from mediatheque.models import Book, BoardGame, CD, DVD, Media
+from mediatheque.search import search_media
+
+CSV_CATALOGUE = """media_type,name,author,producer,artist,creators,available,game_type
+book,Les Misérables,Victor Hugo,,,,true,
+dvd,Le Parrain,,Albert Ruddy,,,false,
+cd,Thriller,,,Michael Jackson,,,
+board_game,Carcassonne,,,,Klaus-Jürgen Wrede,oui,Tuiles
+magazine,Inconnu,,,,,,
+book,,Sans Titre,,,,,
+book,Sans auteur,,,,,peut-être,
+"""
+
+
+@pytest.mark.django_db
+def test_import_csv_creates_each_subclass_and_rejects_invalid_rows():
+    imported, errors = import_media(io.StringIO(CSV_CATALOGUE), 'csv', chunk_size=3)
+
+    assert imported == 4
+    assert [error.line for error in errors] == [6, 7, 8]
+    assert Book.objects.get().author == 'Victor Hugo'
+    assert not DVD.objects.get().available
+    assert CD.objects.get().artist == 'Michael Jackson'
+    game = BoardGame.objects.get()
+    assert game.creators == 'Klaus-Jürgen Wrede' and game.game_type == 'Tuiles'
+    assert str(Media.objects.get(name='Thriller')) == 'Thriller (CD)'
+    # Les médias importés sont indexés pour la recherche
+    assert [media.name for media in search_media('wrede')] == ['Carcassonne']
+
+
+@pytest.mark.django_db
+def test_import_jsonl_reports_malformed_lines():
+    lines = [
+        json.dumps({'media_type': 'book', 'name': 'Germinal', 'author': 'Émile Zola'}),
+        '{pas du json',
+        json.dumps(['book']),
+        json.dumps({'media_type': 'cd', 'name': 'Abbey Road', 'artist': 'The Beatles', 'can_borrow': False}),
+    ]
+
+    imported, errors = import_media(io.StringIO('\n'.join(lines)), 'jsonl')
+
+    assert imported == 2
+    assert [error.line for error in errors] == [2, 3]
+    assert not CD.objects.get().can_borrow
+
+
+@pytest.mark.django_db
+def test_import_writes_rows_in_batches():
+    def count_queries(size):
+        rows = '\n'.join(json.dumps({'media_type': 'book', 'name': f'Livre {i}', 'author': 'Auteur'})
+                         for i in range(size))
+        with CaptureQueriesContext(connection) as context:
+            import_media(io.StringIO(rows), 'jsonl', chunk_size=1000)
+        return len(context.captured_queries)
+
+    # Quelques INSERT groupés par lot, et non plusieurs requêtes par ligne
+    assert count_queries(500) <= 10
+
+
+@pytest.mark.django_db
+def test_import_media_command(tmp_path):
+    path = tmp_path / 'catalogue.csv'
+    path.write_text(CSV_CATALOGUE, encoding='utf-8')
+    output = io.StringIO()
+
+    call_command('import_media', str(path), stdout=output, stderr=io.StringIO())
+
+    assert 'Import terminé : 4 médias' in output.getvalue()
+    assert Media.objects.count() == 4
@@ -0,0 +1,73 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.urls import reverse
+from mediatheque.instrumentation import RequestStats, RequestStatsMiddleware, percentile, request_stats
+from mediatheque.models import Book
+
+User = get_user_model()
+
+
+@pytest.fixture
+def stats_enabled(settings, tmp_path):
+    settings.REQUEST_STATS = {'ENABLED': True, 'SNAPSHOT_PATH': str(tmp_path / 'stats.json'), 'SNAPSHOT_EVERY': 1}
+    request_stats.reset()
+    yield settings.REQUEST_STATS
+    request_stats.reset()
+
+
+def test_middleware_is_removed_when_disabled(settings):
+    settings.REQUEST_STATS = {'ENABLED': False}
+
+    with pytest.raises(MiddlewareNotUsed):
+        RequestStatsMiddleware(lambda request: None)
+
+
+def test_ring_buffer_keeps_latest_samples_and_percentiles():
+    stats = RequestStats(buffer_size=100)
+    for value in range(1, 201):
+        stats.record('media_list', value, 0, 0, value)
+
+    summary = stats.summary()['media_list']
+
+    assert summary['count'] == 100
+    assert summary['queries'] == {'p50': 150, 'p95': 195, 'p99': 199, 'max': 200}
+    assert percentile([1, 2, 3, 4], 50) == 2
+
+
+@pytest.mark.django_db
+def test_middleware_records_per_view_metrics(client, stats_enabled):
+    Book.objects.create(name='Livre', author='Auteur')
+    staff_user = User.objects.create_superuser(username='staffuser', password='password123')
+    client.force_login(staff_user)
+
+    client.get(reverse('media_list'))
+    client.get(reverse('media_list'))
+    response = client.get(reverse('request_stats'))
+
+    views = response.json()['views']
+    media_list = views['media_list']
+    assert media_list['count'] == 2
+    assert media_list['queries']['p50'] >= 2
+    assert media_list['template_ms']['max'] > 0
+    assert media_list['wall_ms']['p50'] >= media_list['db_ms']['p50']
+
+    # Le résumé est aussi écrit sur disque pour la commande request_stats
+    output = StringIO()
+    call_command('request_stats', '--json', stdout=output)
+    assert json.loads(output.getvalue())['media_list']['count'] == 2
+    output = StringIO()
+    call_command('request_stats', stdout=output)
+    assert 'media_list' in output.getvalue()
+
+
+@pytest.mark.django_db
+def test_request_stats_endpoint_is_staff_only(client):
+    member = User.objects.create_user(username='member', password='password123')
+    client.force_login(member)
+
+    assert client.get(reverse('request_stats')).status_code == 403
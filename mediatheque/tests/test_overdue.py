@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from mediatheque.models import Book, MediathequeBorrow
+from mediatheque import overdue as overdue_module
+from mediatheque.overdue import mark_overdue_borrows
+from staff.models import StaffBorrow
+
+User = get_user_model()
+
+
+def create_borrow(model, member, due_in_days, **kwargs):
+    book = Book.objects.create(name='Livre', author='Auteur')
+    return model.objects.create(user=member, media=book, due_date=timezone.now() + timedelta(days=due_in_days),
+                                **kwargs)
+
+
+@pytest.mark.django_db
+def test_mark_overdue_borrows_flags_only_overdue_active_loans(member):
+    overdue = create_borrow(MediathequeBorrow, member, -1)
+    returned = create_borrow(MediathequeBorrow, member, -1, is_returned=True)
+    current = create_borrow(MediathequeBorrow, member, 3)
+
+    assert mark_overdue_borrows(MediathequeBorrow, chunk_size=1) == 1
+
+    late = set(MediathequeBorrow.objects.filter(is_late=True).values_list('pk', flat=True))
+    assert late == {overdue.pk}
+    assert returned.pk not in late and current.pk not in late
+    assert not MediathequeBorrow.can_borrow(member)
+
+
+@pytest.mark.django_db
+def test_mark_overdue_borrows_is_incremental(member):
+    now = timezone.now()
+    create_borrow(MediathequeBorrow, member, -2)
+    soon_due = create_borrow(MediathequeBorrow, member, 1)
+    assert mark_overdue_borrows(MediathequeBorrow, now=now) == 1
+
+    # Passage suivant : seul l'emprunt arrivé à échéance depuis est marqué
+    assert mark_overdue_borrows(MediathequeBorrow, now=now + timedelta(days=2)) == 1
+    assert MediathequeBorrow.objects.get(pk=soon_due.pk).is_late
+
+    # Un emprunt antérieur au repère n'est repris qu'avec full=True
+    create_borrow(MediathequeBorrow, member, -5)
+    assert mark_overdue_borrows(MediathequeBorrow, now=now + timedelta(days=3)) == 0
+    assert mark_overdue_borrows(MediathequeBorrow, now=now + timedelta(days=3), full=True) == 1
+
+
+@pytest.mark.django_db
+def test_mark_overdue_borrows_command_covers_staff_borrows(member):
+    create_borrow(MediathequeBorrow, member, -1)
+    create_borrow(StaffBorrow, member, -1)
+
+    call_command('mark_overdue_borrows', '--chunk-size', '10')
+
+    # StaffBorrow est un proxy : les deux emprunts sont dans la même table
+    assert MediathequeBorrow.objects.filter(is_late=True).count() == 2
+    assert StaffBorrow.objects.filter(is_late=True).count() == 2
+
+
+@pytest.mark.django_db
+def test_overdue_query_uses_index():
+    queryset = MediathequeBorrow.objects.filter(is_returned=False, due_date__lt=timezone.now())
+    with connection.cursor() as cursor:
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+
+    assert 'USING INDEX' in plan and 'due_date' in plan
+
+
+@pytest.mark.django_db
+def test_loan_returned_during_the_chunk_is_not_marked(member, monkeypatch):
+    returned = create_borrow(MediathequeBorrow, member, -2)
+    overdue = create_borrow(MediathequeBorrow, member, -1)
+    mark_late = overdue_module._mark_late
+
+    def return_then_mark(model, ids):
+        # Rendu entre la lecture du lot et son UPDATE
+        MediathequeBorrow.objects.filter(pk=returned.pk).update(is_returned=True)
+        return mark_late(model, ids)
+
+    monkeypatch.setattr(overdue_module, '_mark_late', return_then_mark)
+
+    assert mark_overdue_borrows(MediathequeBorrow) == 1
+    assert not MediathequeBorrow.objects.get(pk=returned.pk).is_late
+    assert MediathequeBorrow.objects.get(pk=overdue.pk).is_late
+    assert User.objects.get(pk=member.pk).late_borrow_count == 1
@@ -0,0 +1,97 @@
+import base64
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.models import Book, DVD, Media, MediathequeBorrow
+from mediatheque.pagination import KeysetPaginator
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalogue():
+    # Deux médias portent le même nom pour vérifier le départage par id
+    names = ['Alpha', 'Bravo', 'Bravo', 'Charlie', 'Delta', 'Echo', 'Foxtrot']
+    return [Book.objects.create(name=name, author='Auteur') for name in names]
+
+
+def walk_forward(paginator):
+    pages = [paginator.get_page()]
+    while pages[-1].has_next:
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    return pages
+
+
+@pytest.mark.django_db
+def test_keyset_pages_cover_every_media_once(catalogue):
+    paginator = KeysetPaginator(Media.objects.all(), 'name', per_page=3)
+
+    pages = walk_forward(paginator)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    seen = [media.pk for page in pages for media in page]
+    assert seen == [media.pk for media in catalogue]
+    assert not pages[0].has_previous
+    assert not pages[-1].has_next
+
+
+@pytest.mark.django_db
+def test_keyset_previous_cursor_returns_previous_page(catalogue):
+    paginator = KeysetPaginator(Media.objects.all(), 'name', per_page=3)
+    pages = walk_forward(paginator)
+
+    previous = paginator.get_page(pages[2].previous_cursor)
+
+    assert [media.pk for media in previous] == [media.pk for media in pages[1]]
+    assert previous.has_next and previous.has_previous
+
+
+@pytest.mark.django_db
+def test_keyset_invalid_cursor_returns_first_page(catalogue):
+    paginator = KeysetPaginator(Media.objects.all(), 'name', per_page=3)
+
+    page = paginator.get_page('pas-un-curseur')
+
+    assert [media.name for media in page] == ['Alpha', 'Bravo', 'Bravo']
+
+
+@pytest.mark.django_db
+def test_keyset_cursor_with_invalid_date_returns_first_page(catalogue):
+    member = User.objects.create_user(username='membre', password='password123')
+    borrows = [MediathequeBorrow.objects.create(user=member, media=media, due_date=timezone.now())
+               for media in catalogue[:2]]
+    paginator = KeysetPaginator(MediathequeBorrow.objects.all(), 'due_date', per_page=3)
+    # Curseur bien formé dont la date est impossible : to_python lève ValidationError
+    cursor = base64.urlsafe_b64encode(json.dumps(['n', '2024-02-30 10:00', 1]).encode()).decode()
+
+    page = paginator.get_page(cursor)
+
+    assert [borrow.pk for borrow in page] == [borrow.pk for borrow in borrows]
+
+
+@pytest.mark.django_db
+def test_keyset_page_costs_one_query(catalogue, django_assert_num_queries):
+    paginator = KeysetPaginator(Media.objects.all(), 'name', per_page=3)
+    last_cursor = walk_forward(paginator)[-2].next_cursor
+
+    with django_assert_num_queries(1):
+        paginator.get_page()
+    with django_assert_num_queries(1):
+        paginator.get_page(last_cursor)
+
+
+@pytest.mark.django_db
+def test_media_list_filters_and_paginates(client, catalogue):
+    DVD.objects.create(name='Bravo', producer='Producteur')
+    staff_user = User.objects.create_superuser(username='staffuser', password='password123')
+    client.force_login(staff_user)
+
+    response = client.get(reverse('media_list'), {'media_type': 'book', 'available': 'true'})
+
+    page = response.context['page']
+    assert len(page) == len(catalogue)
+    assert not page.has_next
+    assert all(status['media'].media_type == 'book' for status in response.context['media_status'])
@@ -0,0 +1,80 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.models import Book, BoardGame, MediathequeBorrow
+
+User = get_user_model()
+
+TABLES = ('mediatheque_mediathequeborrow', 'mediatheque_media')
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def table_plans(queries):
+    # Étapes du plan qui lisent les tables des médias et des emprunts
+    steps = []
+    for query in queries:
+        if query['sql'].startswith('SELECT') and any(f'"{table}"' in query['sql'] for table in TABLES):
+            steps.extend(step for step in query_plan(query['sql'])
+                         if re.search(rf'\b({"|".join(TABLES)})\b', step))
+    return steps
+
+
+@pytest.fixture
+def library():
+    member = User.objects.create_user(username='membre', password='motdepasse')
+    member.groups.add(Group.objects.get(name='client'))
+    staff = User.objects.create_superuser(username='bibliothecaire', password='motdepasse', role='staff')
+    staff.groups.add(Group.objects.get(name='staff'))
+    now = timezone.now()
+    for i in range(3):
+        book = Book.objects.create(name=f'Livre {i}', author='Auteur')
+        MediathequeBorrow.objects.create(user=member, media=book, due_date=now + timedelta(days=i - 1))
+    BoardGame.objects.create(name='Jeu', creators='Créateurs')
+    return member, staff
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('user_index, url_name, query', [
+    (0, 'authentification:espace_client', ''),
+    (0, 'authentification:espace_client', '?media_type=book'),
+    (1, 'authentification:espace_staff', ''),
+    (1, 'authentification:espace_staff', '?media_type=book&available=true'),
+])
+def test_dashboard_queries_use_an_index(client, library, user_index, url_name, query):
+    client.force_login(library[user_index])
+
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(reverse(url_name) + query).status_code == 200
+
+    steps = table_plans(context.captured_queries)
+    assert steps
+    # Ni parcours complet d'une table, ni tri en mémoire de toutes ses lignes
+    assert [step for step in steps if not re.search(r'USING (COVERING )?INDEX|INTEGER PRIMARY KEY', step)] == []
+
+
+@pytest.mark.django_db
+def test_active_loan_predicates_use_the_partial_indexes(client, library):
+    member, staff = library
+    used = set()
+    client_url = reverse('authentification:espace_client')
+    for user, url in [(member, client_url), (member, f'{client_url}?media_type=book'),
+                      (staff, reverse('authentification:espace_staff'))]:
+        client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        used.update(re.findall(r'USING (?:COVERING )?INDEX (\w+)', ' '.join(table_plans(context.captured_queries))))
+
+    assert {'borrow_active_user_idx', 'borrow_active_due_idx', 'media_borrowable_name_idx',
+            'media_borrowable_type_idx'} <= used
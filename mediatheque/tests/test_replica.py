@@ -0,0 +1,64 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.urls import reverse
+from mediatheque.db_routers import PIN_SESSION_KEY, REPLICA_ALIAS
+from mediatheque.models import Book, Media
+from mediatheque.sqlite import refresh_replica
+
+User = get_user_model()
+
+# Les données doivent être validées dans la base principale pour être recopiées
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def replica(tmp_path):
+    # Alias ajouté après la création de la base de test : un second fichier SQLite,
+    # rempli par l'API de sauvegarde
+    connections.settings[REPLICA_ALIAS] = {
+        **connections[DEFAULT_DB_ALIAS].settings_dict,
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    refresh_replica(REPLICA_ALIAS)
+    # Connexion ouverte ici : le cas de test n'autorise pas les alias qu'il ne connaît pas
+    connections[REPLICA_ALIAS].connect()
+    yield REPLICA_ALIAS
+    connections[REPLICA_ALIAS].close()
+    del connections[REPLICA_ALIAS]
+    del connections.settings[REPLICA_ALIAS]
+
+
+@pytest.fixture
+def staff_client(client, replica):
+    client.force_login(User.objects.create_superuser(username='staff', password='password123'))
+    return client
+
+
+def test_read_only_views_read_from_replica(staff_client, replica):
+    Book.objects.create(name='Dune', author='Herbert')
+    refresh_replica(replica)
+    Book.objects.create(name='Fondation', author='Asimov')  # pas encore recopié
+
+    content = staff_client.get(reverse('media_list')).content.decode()
+    assert 'Dune' in content
+    assert 'Fondation' not in content
+
+
+def test_member_reads_own_writes_after_borrowing(staff_client, replica, client):
+    book = Book.objects.create(name='Dune', author='Herbert')
+    refresh_replica(replica)
+
+    staff_client.post(reverse('borrow_media', args=[book.pk]))
+    assert PIN_SESSION_KEY in staff_client.session
+
+    # La réplique ignore encore l'emprunt, mais le membre qui l'a fait lit la base principale
+    content = staff_client.get(reverse('media_list')).content.decode()
+    assert 'Emprunté par staff' in content
+
+
+def test_reads_outside_decorated_views_and_transactions_stay_on_primary(replica):
+    assert router.db_for_read(Media) == DEFAULT_DB_ALIAS
+    assert router.db_for_write(Media) == DEFAULT_DB_ALIAS
+    with transaction.atomic():
+        assert router.db_for_read(Media) == DEFAULT_DB_ALIAS
@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from mediatheque.models import Book, CD, DVD, BoardGame, Media
+from mediatheque.search import search_media, FTS_TABLE
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalogue():
+    return {
+        'book': Book.objects.create(name='Les Misérables', author='Victor Hugo'),
+        'dvd': DVD.objects.create(name='Le Parrain', producer='Albert Ruddy'),
+        'cd': CD.objects.create(name='Thriller', artist='Michael Jackson'),
+        'game': BoardGame.objects.create(name='Carcassonne', creators='Klaus-Jürgen Wrede'),
+    }
+
+
+def names(results):
+    return [media.name for media in results]
+
+
+@pytest.mark.django_db
+def test_search_matches_name_and_creators(catalogue):
+    assert names(search_media('thriller')) == ['Thriller']
+    assert names(search_media('hugo')) == ['Les Misérables']
+    assert names(search_media('ruddy')) == ['Le Parrain']
+    assert names(search_media('wrede')) == ['Carcassonne']
+
+
+@pytest.mark.django_db
+def test_search_prefix_and_accents(catalogue):
+    assert names(search_media('miser')) == ['Les Misérables']
+    assert names(search_media('jürg')) == ['Carcassonne']
+    assert names(search_media('jurgen')) == ['Carcassonne']
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_before_creators(catalogue):
+    Book.objects.create(name='Biographie', author='Thriller Auteur')
+
+    assert names(search_media('thriller')) == ['Thriller', 'Biographie']
+
+
+@pytest.mark.django_db
+def test_search_ignores_fts_syntax(catalogue):
+    assert search_media('"') == []
+    assert names(search_media('hugo AND -NEAR(')) == []
+    assert names(search_media('victor-hugo')) == ['Les Misérables']
+
+
+@pytest.mark.django_db
+def test_search_index_follows_updates_and_deletes(catalogue):
+    book = catalogue['book']
+    book.name = 'Notre-Dame de Paris'
+    book.save()
+    # Un enregistrement via le modèle parent conserve le créateur de la sous-classe
+    Media.objects.get(pk=catalogue['cd'].pk).save()
+
+    assert names(search_media('notre')) == ['Notre-Dame de Paris']
+    assert search_media('misérables') == []
+    assert names(search_media('jackson')) == ['Thriller']
+
+    catalogue['dvd'].delete()
+    assert search_media('parrain') == []
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index_command(catalogue):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    assert search_media('hugo') == []
+
+    call_command('rebuild_search_index')
+
+    assert names(search_media('hugo')) == ['Les Misérables']
+
+
+@pytest.mark.django_db
+def test_media_search_view(client, catalogue):
+    staff_user = User.objects.create_superuser(username='staffuser', password='password123')
+    client.force_login(staff_user)
+
+    response = client.get(reverse('media_search'), {'q': 'jack'})
+
+    assert response.status_code == 200
+    assert names(response.context['results']) == ['Thriller']
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mediatheque.sessions import purge_expired_sessions
+
+
+def create_session(expires_in_days):
+    session = SessionStore()
+    session['cle'] = 'valeur'
+    session.set_expiry(timezone.now() + timedelta(days=expires_in_days))
+    session.save()
+    return session.session_key
+
+
+@pytest.mark.django_db
+def test_purge_deletes_expired_sessions_in_chunks():
+    expired = [create_session(-1) for _ in range(5)]
+    active = create_session(1)
+
+    with CaptureQueriesContext(connection) as context:
+        assert purge_expired_sessions(chunk_size=2) == len(expired)
+
+    deletes = [query for query in context.captured_queries if query['sql'].startswith('DELETE')]
+    assert len(deletes) == 3
+    # Suppression rapide du Collector : aucune ligne complète relue avant chaque DELETE
+    assert all('session_data' not in query['sql'] for query in context.captured_queries)
+    assert list(Session.objects.values_list('session_key', flat=True)) == [active]
+
+
+@pytest.mark.django_db
+def test_purge_command_skips_engines_without_session_table(settings, capsys):
+    create_session(-1)
+    settings.SESSION_ENGINE = settings.SESSION_PROFILES['signed_cookies']
+
+    call_command('purge_expired_sessions')
+
+    assert 'rien à purger' in capsys.readouterr().out
+    assert Session.objects.count() == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('profile', ['cache', 'signed_cookies'])
+def test_login_and_logout_do_not_touch_the_session_table(client, settings, profile):
+    settings.SESSION_ENGINE = settings.SESSION_PROFILES[profile]
+    get_user_model().objects.create_user(username='membre', password='motdepasse')
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(reverse('authentification:login'),
+                               {'username': 'membre', 'password': 'motdepasse'})
+        assert response.status_code == 302
+        assert client.session['_auth_user_id']
+        client.get(reverse('authentification:logout'))
+
+    assert all('django_session' not in query['sql'] for query in context.captured_queries)
+    # Message de confirmation porté par un cookie
+    assert 'messages' in response.cookies
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from mediatheque.models import Book, BoardGame, CD, DVD, Media
+
+MTI = [('mediatheque', '0004_overdue_maintenance')]
+
+
+@pytest.mark.django_db
+def test_subclasses_are_proxies_over_one_table():
+    book = Book.objects.create(name='Dune', author='Herbert')
+    DVD.objects.create(name='Alien', producer='Carroll')
+    BoardGame.objects.create(name='Catan', creators='Teuber', game_type='Stratégie')
+
+    with CaptureQueriesContext(connection) as context:
+        assert [media.author for media in Book.objects.all()] == ['Herbert']
+        assert BoardGame.objects.get().game_type == 'Stratégie'
+    assert all('JOIN' not in query['sql'] for query in context.captured_queries)
+
+    # Les attributs du type sont lus avec la ligne Media, sans requête de plus
+    media = Media.objects.get(pk=book.pk)
+    assert (media.media_type, media.author, media.producer) == ('book', 'Herbert', None)
+    assert Media.objects.count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_moves_subclass_rows_into_the_media_table():
+    executor = MigrationExecutor(connection)
+    executor.migrate(MTI)
+    apps = executor.loader.project_state(MTI).apps
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    def create(model_name, media_type, **fields):
+        content_type = ContentType.objects.get_or_create(app_label='mediatheque', model=model_name.lower())[0]
+        return apps.get_model('mediatheque', model_name).objects.create(media_type=media_type,
+                                                                        content_type=content_type, **fields)
+
+    dune = create('Book', 'book', name='Dune', author='Herbert')
+    create('BoardGame', 'board_game', name='Catan', creators='Teuber', is_visible=False)
+    create('Media', 'cd', name='Sans sous-classe')
+
+    try:
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+        assert Book.objects.get().pk == dune.pk
+        assert Book.objects.get().author == 'Herbert'
+        game = BoardGame.objects.get()
+        assert (game.creators, game.is_visible) == ('Teuber', False)
+        assert Media.objects.get(name='Sans sous-classe').artist is None
+        assert 'mediatheque_book' not in connection.introspection.table_names()
+    finally:
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+@pytest.mark.django_db
+def test_polymorphic_returns_each_type_in_order_in_one_query(django_assert_num_queries):
+    for i in range(250):
+        Book.objects.create(name=f'{i:03} livre', author='Auteur')
+        DVD.objects.create(name=f'{i:03} dvd', producer='Producteur')
+        CD.objects.create(name=f'{i:03} cd', artist='Artiste')
+        BoardGame.objects.create(name=f'{i:03} jeu', creators='Créateurs')
+    expected = list(Media.objects.order_by('name', 'id').values_list('pk', 'media_type'))
+
+    with django_assert_num_queries(1):
+        page = list(Media.objects.order_by('name', 'id').polymorphic())
+
+    assert [(media.pk, media.media_type) for media in page] == expected
+    assert [type(media) for media in page[:4]] == [CD, DVD, BoardGame, Book]
+    assert str(page[2]) == '000 jeu'  # BoardGame.__str__
+    assert page[3].author == 'Auteur'
@@ -0,0 +1,40 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+from mediatheque.sqlite import SQLITE_PROFILES
+
+# Chaque test ouvre sa propre base dans tmp_path, pas la base de test
+pytestmark = pytest.mark.django_db
+
+
+def read_pragmas(path):
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(path)}, alias='profile_test')
+    try:
+        with wrapper.cursor() as cursor:
+            values = {}
+            for name in SQLITE_PROFILES['production']:
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+            return values
+    finally:
+        wrapper.close()
+
+
+@override_settings(SQLITE_PROFILE='production')
+def test_production_profile_is_applied_to_new_connections(tmp_path):
+    assert read_pragmas(tmp_path / 'production.sqlite3') == {
+        'journal_mode': 'wal',
+        'synchronous': 1,  # NORMAL
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+    }
+
+
+@override_settings(SQLITE_PROFILE='default')
+def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    pragmas = read_pragmas(tmp_path / 'default.sqlite3')
+    assert pragmas['journal_mode'] == 'delete'
+    assert pragmas['synchronous'] == 2  # FULL
+
@@ -0,0 +1,58 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+from mediatheque.models import Book, BoardGame, Media, MediathequeBorrow
+from mediatheque.search import search_media_ids
+from staff.models import BookStaff, StaffBorrow
+
+# Les migrations modifient le schéma : pas de transaction autour du test
+pytestmark = pytest.mark.django_db(transaction=True)
+
+BEFORE = [('staff', '0002_overdue_index')]
+
+
+def migrate(targets=None):
+    # Sans cible : jusqu'au dernier état
+    executor = MigrationExecutor(connection)
+    targets = targets or executor.loader.graph.leaf_nodes()
+    executor.migrate(targets)
+    return executor.loader.project_state(targets).apps
+
+
+def test_staff_rows_are_merged_into_mediatheque_tables():
+    apps = migrate(BEFORE)
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    content_type = ContentType.objects.get_or_create(app_label='staff', model='bookstaff')[0]
+    # Table des membres au dernier état : le modèle courant, pas l'historique partiel
+    member = get_user_model().objects.create_user(username='membre')
+    apps.get_model('staff', 'BookStaff').objects.create(name='Dune', author='Herbert', media_type='book',
+                                                        content_type=content_type)
+    apps.get_model('staff', 'BoardGameStaff').objects.create(name='Catan', creators='Teuber',
+                                                             media_type='board_game', content_type=content_type)
+    media = apps.get_model('mediatheque', 'Media').objects.create(
+        name='Fondation', media_type='dvd',
+        content_type=ContentType.objects.get_or_create(app_label='mediatheque', model='media')[0],
+    )
+    apps.get_model('staff', 'StaffBorrow').objects.create(user_id=member.pk, media=media, due_date=timezone.now())
+
+    try:
+        migrate()
+
+        assert Book.objects.get().author == 'Herbert'
+        assert BoardGame.objects.get().creators == 'Teuber'
+        assert BookStaff.objects.get().name == 'Dune'
+        assert Media.objects.get(name='Dune').content_type.model == 'book'
+        assert search_media_ids('herbert') == [Book.objects.get().pk]
+        assert MediathequeBorrow.objects.get().media_id == media.pk
+        assert StaffBorrow.objects.count() == 1
+        assert 'staff_mediastaff' not in connection.introspection.table_names()
+    finally:
+        # Remet la base au dernier état pour les tests suivants
+        migrate()
+
+
+def test_borrow_counters_are_backfilled_before_the_merge():
+    plan = MigrationExecutor(connection).loader.graph.forwards_plan(('staff', '0003_merge_into_mediatheque'))
+    assert ('authentification', '0002_borrow_counters') in plan
@@ -21,5 +21,6 @@ from authentification.views import home_view
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('authentification.urls')),
+    path('staff/', include('staff.urls')),
     path('', home_view, name='home'),
 ]